@@ -15,32 +15,58 @@
 # along with hoa-utils.  If not, see <https://www.gnu.org/licenses/>.
 #
 """This module contains the definitions of acceptance atoms."""
-from dataclasses import dataclass
-from enum import Enum
-from functools import reduce, singledispatch
-from typing import Optional, Set, Tuple, Union
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import cast, FrozenSet, List, Optional, Tuple, Union
 
 from hoa.ast.boolean_expression import (
     BinaryOp,
     boolean_op_wrapper,
     FalseFormula,
+    interned,
+    NODE_ATOM,
+    NODE_BINARY_OP,
+    NODE_CONSTANT,
+    NODE_UNARY_OP,
+    NodeKinds,
     PositiveAnd,
     PositiveOr,
     TrueFormula,
     UnaryOp,
 )
+from hoa.helpers.base import add_slots, memoized, set_bits
 from hoa.types import ACCEPTANCE_PARAMETER, identifier
 
+# the values of the atom types, which are integers for cheap hashing and comparison.
+FIN_ATOM = 0
+INF_ATOM = 1
+ATOM_NAMES = ("Fin", "Inf")
 
-class AtomType(Enum):
-    """This is an enumeration to represent the possible atom types."""
 
-    FINITE = "Fin"
-    INFINITE = "Inf"
+class AtomType(IntEnum):
+    """
+    This is an enumeration to represent the possible atom types.
+
+    Members compare equal to the plain integers 'FIN_ATOM' and 'INF_ATOM',
+    and can be looked up by name:
+
+    >>> AtomType("Fin") == FIN_ATOM
+    True
+    """
+
+    FINITE = FIN_ATOM
+    INFINITE = INF_ATOM
+
+    @classmethod
+    def _missing_(cls, value):
+        """Look up the atom type by its name, i.e. 'Fin' or 'Inf'."""
+        if value in ATOM_NAMES:
+            return cls(ATOM_NAMES.index(value))
+        return None
 
     def __str__(self):
         """Get the string representation."""
-        return self.value
+        return ATOM_NAMES[self]
 
 
 @boolean_op_wrapper(
@@ -48,6 +74,8 @@ class AtomType(Enum):
     or_=PositiveOr["AcceptanceCondition"],
     not_=None,
 )
+@interned
+@add_slots
 @dataclass(order=True, unsafe_hash=True, frozen=True)
 class AcceptanceAtom:
     """Implement the acceptance atom."""
@@ -104,39 +132,74 @@ AcceptanceCondition = Union[
 ]
 
 
-@singledispatch
-def accepting_sets(_) -> Set[int]:
-    """
-    Compute the accepting sets of an acceptance condition.
+# the kinds of the nodes of acceptance conditions.
+_NODE_KINDS = NodeKinds({AcceptanceAtom: NODE_ATOM})
 
-    :param _: the acceptance condition formula.
-    :return: the set of accepting sets.
-    """
-    return set()
 
+def _bin_popcount(mask: int) -> int:
+    """Count the bits set in a non-negative integer."""
+    return bin(mask).count("1")
 
-@accepting_sets.register  # type: ignore
-def _(acceptance_condition: BinaryOp):
-    return reduce(
-        lambda x, y: x.union(y), map(accepting_sets, acceptance_condition.operands)
-    )
 
+# 'int.bit_count' is only available from Python 3.10.
+_popcount = getattr(int, "bit_count", _bin_popcount)
 
-@accepting_sets.register  # type: ignore
-def _(acceptance_condition: UnaryOp):
-    return accepting_sets(acceptance_condition.argument)
 
+@memoized
+def accepting_sets_mask(acceptance_condition: AcceptanceCondition) -> int:
+    """
+    Compute the accepting sets of an acceptance condition, as a bitmask.
+
+    The i-th bit of the result is set iff the accepting set i
+    occurs in the condition. Unions are single integer ORs,
+    without intermediate hash tables.
+
+    >>> accepting_sets_mask(Fin(0) & Inf(2))
+    5
+
+    :param acceptance_condition: the acceptance condition formula.
+    :return: the bitmask of accepting sets.
+    """
+    kind = _NODE_KINDS[type(acceptance_condition)]
+    if kind == NODE_ATOM:
+        return 1 << cast(AcceptanceAtom, acceptance_condition).acceptance_set
+    if kind == NODE_CONSTANT:
+        return 0
+    mask = 0
+    stack: List[AcceptanceCondition] = [acceptance_condition]
+    while len(stack) > 0:
+        node = stack.pop()
+        kind = _NODE_KINDS[type(node)]
+        # the kind tells the type of the node, which mypy cannot narrow.
+        if kind == NODE_ATOM:
+            mask |= 1 << cast(AcceptanceAtom, node).acceptance_set
+        elif kind == NODE_BINARY_OP:
+            stack.extend(cast(BinaryOp, node).operands)
+        elif kind == NODE_UNARY_OP:
+            stack.append(cast(UnaryOp, node).argument)
+    return mask
+
+
+@memoized
+def accepting_sets(acceptance_condition: AcceptanceCondition) -> FrozenSet[int]:
+    """
+    Compute the accepting sets of an acceptance condition.
+
+    The sets are decoded from 'accepting_sets_mask'. Since formulas
+    are immutable, results are memoized on the formula.
 
-@accepting_sets.register  # type: ignore
-def _(acceptance_condition: AcceptanceAtom):
-    return {acceptance_condition.acceptance_set}
+    :param acceptance_condition: the acceptance condition formula.
+    :return: the set of accepting sets.
+    """
+    return set_bits(accepting_sets_mask(acceptance_condition))
 
 
 def nb_accepting_sets(acceptance_condition: AcceptanceCondition):
     """Get the number of accepting sets."""
-    return len(accepting_sets(acceptance_condition))
+    return _popcount(accepting_sets_mask(acceptance_condition))
 
 
+@add_slots
 @dataclass(order=True, unsafe_hash=True, frozen=True)
 class Acceptance:
     """This class represents the acceptance in the HOA format."""
@@ -144,3 +207,24 @@ class Acceptance:
     condition: AcceptanceCondition
     name: Optional[identifier] = None
     parameters: Tuple[ACCEPTANCE_PARAMETER, ...] = tuple()
+    _accepting_sets_mask: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        """Compute the accepting sets of the condition once and for all."""
+        mask = accepting_sets_mask(self.condition)
+        object.__setattr__(self, "_accepting_sets_mask", mask)
+
+    @property
+    def accepting_sets_mask(self) -> int:
+        """Get the accepting sets of the acceptance condition, as a bitmask."""
+        return self._accepting_sets_mask
+
+    @property
+    def accepting_sets(self) -> FrozenSet[int]:
+        """Get the accepting sets of the acceptance condition."""
+        return accepting_sets(self.condition)
+
+    @property
+    def nb_accepting_sets(self) -> int:
+        """Get the number of accepting sets."""
+        return _popcount(self._accepting_sets_mask)
@@ -17,48 +17,175 @@
 
 """This module contains the implementation of generic boolean expressions."""
 
-from dataclasses import dataclass
-from typing import Any, ClassVar, Generic, Optional, Sequence, Type, TypeVar
+from dataclasses import dataclass, field, fields
+from typing import (
+    Any,
+    ClassVar,
+    Dict,
+    Generic,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from hoa.helpers.base import add_slots, TRANSIENT
 
 T = TypeVar("T")
 
 
-@dataclass(order=True, unsafe_hash=True, frozen=True)
+@add_slots
+@dataclass(order=True, frozen=True)
 class BinaryOp(Generic[T]):
-    """Binary operator."""
+    """
+    Binary operator.
+
+    The operands are always stored as a tuple,
+    so consumers can rely on indexed access without defensive copies.
+    """
 
     SYMBOL: ClassVar[str]
-    operands: Sequence[T]
+    operands: Tuple[T, ...]
+    _str: Optional[str] = field(
+        init=False, repr=False, compare=False, metadata=TRANSIENT
+    )
+    _memo: Optional[Dict[str, Any]] = field(
+        init=False, repr=False, compare=False, metadata=TRANSIENT
+    )
+    _hash: Optional[int] = field(
+        init=False, repr=False, compare=False, metadata=TRANSIENT
+    )
+
+    def __post_init__(self):
+        """Initialize the caches of the string representation, of 'memoized' and of the hash."""
+        object.__setattr__(self, "_str", None)
+        object.__setattr__(self, "_memo", None)
+        object.__setattr__(self, "_hash", None)
+
+    def __hash__(self) -> int:
+        """Get the hash (computed only once)."""
+        result = self._hash
+        if result is None:
+            result = hash(self.operands)
+            object.__setattr__(self, "_hash", result)
+        return result
 
     def __str__(self) -> str:
-        """Get the string representation."""
-        return f"({self.SYMBOL} {' '.join(map(str, self.operands))})"
+        """Get the string representation (computed only once)."""
+        result = self._str
+        if result is None:
+            result = _to_string(self)
+            object.__setattr__(self, "_str", result)
+        return result
 
     def __repr__(self) -> str:
         """Get an unambiguous string representation."""
         return f"{type(self).__name__}({repr(self.operands)})"
 
 
-@dataclass(order=True, unsafe_hash=True, frozen=True)
+@add_slots
+@dataclass(order=True, frozen=True)
 class UnaryOp(Generic[T]):
     """Unary operator."""
 
     SYMBOL: ClassVar[str]
     argument: T
+    _str: Optional[str] = field(
+        init=False, repr=False, compare=False, metadata=TRANSIENT
+    )
+    _memo: Optional[Dict[str, Any]] = field(
+        init=False, repr=False, compare=False, metadata=TRANSIENT
+    )
+    _hash: Optional[int] = field(
+        init=False, repr=False, compare=False, metadata=TRANSIENT
+    )
+
+    def __post_init__(self):
+        """Initialize the caches of the string representation, of 'memoized' and of the hash."""
+        object.__setattr__(self, "_str", None)
+        object.__setattr__(self, "_memo", None)
+        object.__setattr__(self, "_hash", None)
+
+    def __hash__(self) -> int:
+        """Get the hash (computed only once)."""
+        result = self._hash
+        if result is None:
+            result = hash((self.argument,))
+            object.__setattr__(self, "_hash", result)
+        return result
 
     def __str__(self) -> str:
-        """Get the string representation."""
-        return f"({self.SYMBOL} {self.argument})"
+        """Get the string representation (computed only once)."""
+        result = self._str
+        if result is None:
+            result = _to_string(self)
+            object.__setattr__(self, "_str", result)
+        return result
 
     def __repr__(self) -> str:
         """Get an unambiguous string representation."""
         return f"{type(self).__name__}({repr(self.argument)})"
 
 
+def post_order(formula: Any) -> Iterator[Any]:
+    """
+    Iterate over the nodes of a formula in post-order, without recursion.
+
+    Every operation is yielded after its operands, so a computation
+    over the formula can be folded with a stack of partial results,
+    whatever the depth of the formula.
+
+    :param formula: the formula.
+    :return: the iterator over the nodes.
+    """
+    stack: List[Tuple[Any, bool]] = [(formula, False)]
+    pop, push = stack.pop, stack.append
+    while stack:
+        node, expanded = pop()
+        if expanded:
+            yield node
+        elif isinstance(node, BinaryOp):
+            push((node, True))
+            stack.extend((operand, False) for operand in reversed(node.operands))
+        elif isinstance(node, UnaryOp):
+            push((node, True))
+            push((node.argument, False))
+        else:
+            yield node
+
+
+def _to_string(formula: Any) -> str:
+    """Get the string representation of a formula, folding over its nodes."""
+    results: List[str] = []
+    for node in post_order(formula):
+        if isinstance(node, BinaryOp):
+            nb_operands = len(node.operands)
+            operands = " ".join(results[-nb_operands:])
+            del results[-nb_operands:]
+            results.append(f"({node.SYMBOL} {operands})")
+        elif isinstance(node, UnaryOp):
+            results[-1] = f"({node.SYMBOL} {results[-1]})"
+        else:
+            results.append(str(node))
+    return results[0]
+
+
+@add_slots
 @dataclass(order=True, unsafe_hash=True, frozen=True)
 class TrueFormula:
     """A tautology."""
 
+    _instance: ClassVar[Optional["TrueFormula"]] = None
+
+    def __new__(cls):
+        """Create the tautology, or return it if it already exists."""
+        if cls._instance is None:
+            cls._instance = object.__new__(cls)
+        return cls._instance
+
     def __str__(self) -> str:
         """Get the string representation."""
         return "(true)"
@@ -72,10 +199,19 @@ class TrueFormula:
         return FALSE
 
 
+@add_slots
 @dataclass(order=True, unsafe_hash=True, frozen=True)
 class FalseFormula:
     """A contradiction."""
 
+    _instance: ClassVar[Optional["FalseFormula"]] = None
+
+    def __new__(cls):
+        """Create the contradiction, or return it if it already exists."""
+        if cls._instance is None:
+            cls._instance = object.__new__(cls)
+        return cls._instance
+
     def __str__(self) -> str:
         """Get the string representation."""
         return "(false)"
@@ -93,14 +229,164 @@ TRUE = TrueFormula()
 FALSE = FalseFormula()
 
 
+# types whose equal instances are always the same object.
+# Operands of these types are deduplicated by identity, skipping __hash__ and __eq__.
+_INTERNED_TYPES: Set[type] = {TrueFormula, FalseFormula}
+
+
+def _identity_eq(self, other) -> bool:
+    """Compare interned instances, which are equal iff they are the same object."""
+    return self is other
+
+
+def _interned_values(
+    field_names: Tuple[str, ...],
+    int_fields: Dict[int, type],
+    args: Tuple,
+    kwargs: Dict[str, Any],
+) -> Optional[Tuple]:
+    """
+    Get the field values of an interned instance from the constructor arguments.
+
+    :param field_names: the names of the fields, in order.
+    :param int_fields: the declared types of the integer fields, by position.
+    :param args: the positional arguments.
+    :param kwargs: the keyword arguments.
+    :return: the field values, or None if some of them are missing.
+    """
+    nb_args = len(args)
+    try:
+        values = args + tuple(kwargs[name] for name in field_names[nb_args:])
+    except KeyError:
+        return None
+    if any(type(values[i]) is not t for i, t in int_fields.items()):
+        values = tuple(
+            int_fields[i](value)
+            if i in int_fields and isinstance(value, int)
+            else value
+            for i, value in enumerate(values)
+        )
+    return values
+
+
+def interned(cls):
+    """
+    Make the instances of a dataclass interned.
+
+    Instantiating the class with the same field values returns the same object,
+    hence equal instances are identical, and equality is an identity check.
+    Apply it on top of the dataclass decorator.
+
+    :param cls: the dataclass.
+    :return: the same class, whose instances are interned.
+    """
+    init_fields = [f for f in fields(cls) if f.init]
+    field_names = tuple(f.name for f in init_fields)
+    # the fields declared as int, or as an IntEnum: their integer values,
+    # e.g. bools or plain ints, are converted to the declared type.
+    int_fields = {
+        i: f.type
+        for i, f in enumerate(init_fields)
+        if isinstance(f.type, type) and issubclass(f.type, int) and f.type is not bool
+    }
+    instances: Dict[Tuple, Any] = {}
+    init = cls.__init__
+
+    def __new__(klass, *args, **kwargs):
+        values = _interned_values(field_names, int_fields, args, kwargs)
+        if values is None:
+            # let __init__ report the missing arguments.
+            return object.__new__(klass)
+        # values that are equal but of different types must not share the same instance.
+        key = (klass, values, tuple(map(type, values)))
+        instance = instances.get(key)
+        if instance is None:
+            instance = instances[key] = object.__new__(klass)
+        return instance
+
+    def __init__(self, *args, **kwargs):
+        try:
+            getattr(self, field_names[0])
+        except AttributeError:
+            # first time the instance is returned, initialize it.
+            values = _interned_values(field_names, int_fields, args, kwargs)
+            if values is None:
+                init(self, *args, **kwargs)
+            else:
+                init(self, *values)
+
+    def __getnewargs__(self):
+        # unpickled objects go through __new__, hence are interned as well.
+        return tuple(getattr(self, name) for name in field_names)
+
+    cls.__new__ = __new__
+    cls.__init__ = __init__
+    cls.__getnewargs__ = __getnewargs__
+    cls.__eq__ = _identity_eq
+    _INTERNED_TYPES.add(cls)
+    return cls
+
+
+# kinds of formula nodes, to dispatch on the node type with a single dict lookup.
+NODE_ATOM, NODE_ALIAS, NODE_BINARY_OP, NODE_UNARY_OP, NODE_CONSTANT = range(5)
+
+
+class NodeKinds(dict):
+    """
+    Map the types of the nodes of a formula to their kind.
+
+    The kind of a type not seen before is found by subclass checks,
+    and registered for the next lookups.
+    """
+
+    def __init__(self, leaf_kinds: Dict[type, int]):
+        """
+        Initialize the mapping.
+
+        :param leaf_kinds: the kinds of the leaf types, apart from the boolean constants.
+        """
+        super().__init__(leaf_kinds)
+        self[TrueFormula] = NODE_CONSTANT
+        self[FalseFormula] = NODE_CONSTANT
+        self._leaf_kinds = tuple(leaf_kinds.items())
+
+    def __missing__(self, node_type: type) -> int:
+        """Get the kind of a node type not seen before."""
+        for leaf_type, kind in self._leaf_kinds:
+            if issubclass(node_type, leaf_type):
+                break
+        else:
+            if issubclass(node_type, BinaryOp):
+                kind = NODE_BINARY_OP
+            elif issubclass(node_type, UnaryOp):
+                kind = NODE_UNARY_OP
+            else:
+                kind = NODE_CONSTANT
+        self[node_type] = kind
+        return kind
+
+
 class MonotoneOp(type):
     """Metaclass to simplify monotone operator instantiations."""
 
     _absorbing: ClassVar[Optional[Any]] = None
 
-    def __call__(cls, *args, **kwargs):
-        """Init the subclass object."""
-        operands = _simplify_monotone_op_operands(cls, *args)
+    def __call__(cls, *args, _canonical: bool = False, **kwargs):
+        """
+        Init the subclass object.
+
+        :param args: the operands.
+        :param _canonical: whether the operands are already simplified,
+          i.e. flattened, without duplicates and without the absorbing element.
+          If so, the simplification step is skipped.
+        :return: the operator instance, or the only operand left.
+        """
+        # fewer than two operands are not an operation: the simplification
+        # returns the only operand, or the identity element.
+        if _canonical and len(args) >= 2:
+            operands = args
+        else:
+            operands = _simplify_monotone_op_operands(cls, *args)
         if len(operands) == 1:
             return operands[0]
 
@@ -110,6 +396,7 @@ class MonotoneOp(type):
 class _And(BinaryOp, Generic[T], metaclass=MonotoneOp):
     """And operator."""
 
+    __slots__ = ()
     _absorbing = FALSE
     SYMBOL = "&"
 
@@ -117,6 +404,7 @@ class _And(BinaryOp, Generic[T], metaclass=MonotoneOp):
 class _Or(BinaryOp, Generic[T], metaclass=MonotoneOp):
     """Or operator."""
 
+    __slots__ = ()
     _absorbing = TRUE
     SYMBOL = "|"
 
@@ -124,6 +412,7 @@ class _Or(BinaryOp, Generic[T], metaclass=MonotoneOp):
 class _PositiveAnd(BinaryOp, Generic[T], metaclass=MonotoneOp):
     """And operator."""
 
+    __slots__ = ()
     _absorbing = FALSE
     SYMBOL = "&"
 
@@ -131,6 +420,7 @@ class _PositiveAnd(BinaryOp, Generic[T], metaclass=MonotoneOp):
 class _PositiveOr(BinaryOp, Generic[T], metaclass=MonotoneOp):
     """Or operator."""
 
+    __slots__ = ()
     _absorbing = TRUE
     SYMBOL = "|"
 
@@ -138,9 +428,43 @@ class _PositiveOr(BinaryOp, Generic[T], metaclass=MonotoneOp):
 class _Not(UnaryOp, Generic[T]):
     """Not operator."""
 
+    __slots__ = ()
     SYMBOL = "!"
 
 
+# the operator classes are bound as default arguments of the dunder methods,
+# so no closure cell is looked up at each call.
+def _make_and(and_cls):
+    """Make the __and__ method."""
+
+    def __and__(self, other, _and_cls=and_cls):
+        if type(self) is _and_cls:
+            return _extend_monotone_op(self, other)
+        return _and_cls(self, other)
+
+    return __and__
+
+
+def _make_or(or_cls):
+    """Make the __or__ method."""
+
+    def __or__(self, other, _or_cls=or_cls):
+        if type(self) is _or_cls:
+            return _extend_monotone_op(self, other)
+        return _or_cls(self, other)
+
+    return __or__
+
+
+def _make_invert(not_cls):
+    """Make the __invert__ method."""
+
+    def __invert__(self, _not_cls=not_cls):
+        return _not_cls(self)
+
+    return __invert__
+
+
 # _cls should never be specified by keyword, so start it with an
 # underscore.  The presence of _cls is used to detect if this
 # decorator is being called with parameters or not.
@@ -163,11 +487,11 @@ def boolean_op_wrapper(
 
     def _process_class(cls, and_cls, or_cls, not_cls):
         if and_cls is not None:
-            cls.__and__ = lambda self, other: and_cls(self, other)
+            cls.__and__ = _make_and(and_cls)
         if or_cls is not None:
-            cls.__or__ = lambda self, other: or_cls(self, other)
+            cls.__or__ = _make_or(or_cls)
         if not_cls is not None:
-            cls.__invert__ = lambda self: not_cls(self)
+            cls.__invert__ = _make_invert(not_cls)
         return cls
 
     def wrap(cls):
@@ -187,23 +511,58 @@ PositiveAnd = boolean_op_wrapper(_cls=_PositiveAnd, and_=_PositiveAnd, or_=_Posi
 PositiveOr = boolean_op_wrapper(_cls=_PositiveOr, and_=_PositiveAnd, or_=_PositiveOr)
 
 
+def _extend_monotone_op(op: BinaryOp, operand: Any) -> Any:
+    """
+    Extend a monotone operation with one more operand.
+
+    The operands of 'op' are already simplified, hence, in the common case,
+    the new operand is appended without simplifying the others again.
+
+    :param op: the monotone operation.
+    :param operand: the new operand.
+    :return: the extended monotone operation.
+    """
+    # a class with the MonotoneOp metaclass, whose '__call__' takes
+    # any number of operands: mypy only sees the BinaryOp constructor.
+    cls: Any = type(op)
+    if isinstance(operand, cls) or operand is cls._absorbing:
+        return cls(op, operand)
+    if operand in op.operands:
+        return op
+    return cls(*op.operands, operand, _canonical=True)
+
+
 def _simplify_monotone_op_operands(cls, *operands):
-    operands = list(dict.fromkeys(operands))
-    if len(operands) == 0:
-        return (~cls._absorbing,)
-    elif len(operands) == 1:
-        return (operands[0],)
-    elif cls._absorbing in operands:
-        return cls._absorbing
-
-    # shift-up subformulas with same operator. DFS on expression tree.
+    # shift-up subformulas with same operator (DFS on expression tree),
+    # remove duplicates, and stop as soon as the absorbing element is found.
+    absorbing = cls._absorbing
+    # interned operands are deduplicated by identity, the others by equality.
+    seen_ids: Set[int] = set()
+    seen: Set[Any] = set()
     new_operands = []
-    stack = operands[::-1]  # it is reversed in order to preserve order.
+    # a stack of iterators over the operands, so that no operand tuple is copied.
+    stack = [iter(operands)]
     while len(stack) > 0:
-        element = stack.pop()
-        if not isinstance(element, cls):
+        for element in stack[-1]:
+            if isinstance(element, cls):
+                # visit the subformula first, then resume from the next operand.
+                stack.append(iter(element.operands))
+                break
+            if element is absorbing:
+                return (absorbing,)
+            if type(element) in _INTERNED_TYPES:
+                if id(element) in seen_ids:
+                    continue
+                seen_ids.add(id(element))
+            elif element in seen:
+                continue
+            else:
+                seen.add(element)
             new_operands.append(element)
-            continue
-        stack.extend(reversed(element.operands))  # see above regarding reversed.
+        else:
+            stack.pop()
 
+    if len(new_operands) == 0:
+        # the identity element, i.e. the negation of the absorbing one.
+        return (-absorbing,)
     return tuple(new_operands)
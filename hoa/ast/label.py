@@ -16,25 +16,34 @@
 #
 """This module contains the definitions of acceptance atoms."""
 from dataclasses import dataclass
-from functools import reduce, singledispatch
-from typing import Set, Union
+from typing import cast, FrozenSet, List, Union
 
 from hoa.ast.boolean_expression import (
     And,
     BinaryOp,
     boolean_op_wrapper,
     FalseFormula,
+    interned,
+    NODE_ALIAS,
+    NODE_ATOM,
+    NODE_BINARY_OP,
+    NODE_CONSTANT,
+    NODE_UNARY_OP,
+    NodeKinds,
     Not,
     Or,
     TrueFormula,
     UnaryOp,
 )
+from hoa.helpers.base import add_slots, memoized, set_bits
 from hoa.types import alias as alias_type
 
 
 @boolean_op_wrapper(
     and_=And["LabelExpression"], or_=Or["LabelExpression"], not_=Not["LabelExpression"]
 )
+@interned
+@add_slots
 @dataclass(order=True, unsafe_hash=True, frozen=True)
 class LabelAtom:
     """Implement the label atom."""
@@ -45,6 +54,7 @@ class LabelAtom:
 @boolean_op_wrapper(
     and_=And["LabelExpression"], or_=Or["LabelExpression"], not_=Not["LabelExpression"]
 )
+@add_slots
 @dataclass(order=True, unsafe_hash=True, frozen=True)
 class LabelAlias:
     """Implement the label alias."""
@@ -64,32 +74,57 @@ LabelExpression = Union[
 ]
 
 
-@singledispatch
-def propositions(_) -> Set[int]:
-    """
-    Compute the accepting sets of an acceptance condition.
-
-    :param _: the acceptance condition formula.
-    :return: the set of accepting sets.
-    """
-    return set()
-
+# the kinds of the nodes of label expressions.
+_NODE_KINDS = NodeKinds({LabelAtom: NODE_ATOM, LabelAlias: NODE_ALIAS})
 
-@propositions.register  # type: ignore
-def _(label_expression: BinaryOp):
-    return reduce(lambda x, y: x.union(y), map(propositions, label_expression.operands))
 
+@memoized
+def propositions_mask(label_expression: LabelExpression) -> int:
+    """
+    Compute the propositions of a label expression, as a bitmask.
 
-@propositions.register  # type: ignore
-def _(label_expression: UnaryOp):
-    return propositions(label_expression.argument)
+    The i-th bit of the result is set iff the proposition i occurs
+    in the expression, also through an alias. The formula is visited
+    iteratively, so deeply nested expressions do not hit the recursion
+    limit. Since formulas are immutable, results are memoized on the formula.
 
+    >>> propositions_mask(LabelAtom(0) & ~LabelAtom(3))
+    9
 
-@propositions.register  # type: ignore
-def _(label_expression: LabelAtom):
-    return {label_expression.proposition}
+    :param label_expression: the label expression.
+    :return: the bitmask of propositions.
+    """
+    kind = _NODE_KINDS[type(label_expression)]
+    if kind == NODE_ATOM:
+        return 1 << cast(LabelAtom, label_expression).proposition
+    if kind == NODE_CONSTANT:
+        return 0
+    mask = 0
+    stack: List[LabelExpression] = [label_expression]
+    while len(stack) > 0:
+        node = stack.pop()
+        kind = _NODE_KINDS[type(node)]
+        # the kind tells the type of the node, which mypy cannot narrow.
+        if kind == NODE_ATOM:
+            mask |= 1 << cast(LabelAtom, node).proposition
+        elif kind == NODE_ALIAS:
+            stack.append(cast(LabelAlias, node).expression)
+        elif kind == NODE_BINARY_OP:
+            stack.extend(cast(BinaryOp, node).operands)
+        elif kind == NODE_UNARY_OP:
+            stack.append(cast(UnaryOp, node).argument)
+    return mask
+
+
+@memoized
+def propositions(label_expression: LabelExpression) -> FrozenSet[int]:
+    """
+    Compute the propositions of a label expression.
 
+    The propositions are decoded from 'propositions_mask'. Since formulas
+    are immutable, results are memoized on the formula.
 
-@propositions.register  # type: ignore
-def _(label_expression: LabelAlias):
-    return propositions(label_expression.expression)
+    :param label_expression: the label expression.
+    :return: the set of propositions.
+    """
+    return set_bits(propositions_mask(label_expression))
@@ -16,14 +16,28 @@
 #
 
 """This module contains the core definitions for the tool."""
-from dataclasses import dataclass
-from typing import AbstractSet, Dict, FrozenSet, Optional, Sequence, Tuple, Union
+from array import array
+from dataclasses import dataclass, field, fields
+from types import MappingProxyType
+from typing import (
+    AbstractSet,
+    Any,
+    Dict,
+    FrozenSet,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 from hoa.ast.acceptance import Acceptance
-from hoa.ast.label import LabelAlias, LabelExpression
+from hoa.ast.label import LabelAlias, LabelExpression, propositions_mask
+from hoa.helpers.base import add_slots, assert_, memoized, set_bits, TRANSIENT
 from hoa.types import HEADER_VALUES, headername, identifier, string
 
 
+@add_slots
 @dataclass(frozen=True, order=True, unsafe_hash=True)
 class State:
     """This class represents a state of the automaton."""
@@ -34,18 +48,35 @@ class State:
     acc_sig: Optional[FrozenSet[int]] = None
 
 
-@dataclass(frozen=True, order=True)
+@add_slots
+@dataclass(frozen=True, order=True, unsafe_hash=True)
 class Edge:
-    """This class represents an edge in the automaton."""
+    """
+    This class represents an edge in the automaton.
+
+    The target states are always stored as a tuple.
+    """
 
     state_conj: Sequence[int]
     label: Optional[LabelExpression] = None
     acc_sig: Optional[AbstractSet[int]] = None
 
+    def __post_init__(self):
+        """Freeze the target states."""
+        if type(self.state_conj) is not tuple:
+            object.__setattr__(self, "state_conj", tuple(self.state_conj))
 
+
+@add_slots
 @dataclass(frozen=True)
 class HOAHeader:
-    """This class implements a data structure for the HOA file format header."""
+    """
+    This class implements a data structure for the HOA file format header.
+
+    The header is immutable: since its HOA representation is cached,
+    the sequences and the mappings it is given are frozen
+    into tuples, frozensets and read-only mappings.
+    """
 
     format_version: identifier
     acceptance: Acceptance
@@ -56,16 +87,307 @@ class HOAHeader:
     tool: Optional[Union[string, Sequence[string]]] = None
     name: Optional[string] = None
     properties: Optional[Sequence[identifier]] = None
-    headernames: Optional[Dict[headername, Sequence[HEADER_VALUES]]] = None
+    headernames: Optional[Mapping[headername, Sequence[HEADER_VALUES]]] = None
+    _memo: Optional[Dict[str, Any]] = field(
+        init=False, repr=False, compare=False, metadata=TRANSIENT
+    )
 
+    def __post_init__(self):
+        """Freeze the fields, and initialize the cache of the 'memoized' functions."""
+        if self.start_states is not None:
+            object.__setattr__(
+                self, "start_states", frozenset(map(frozenset, self.start_states))
+            )
+        for name in ("propositions", "aliases", "tool", "properties"):
+            object.__setattr__(self, name, _freeze_sequence(getattr(self, name)))
+        if self.headernames is not None:
+            object.__setattr__(
+                self,
+                "headernames",
+                MappingProxyType(
+                    {
+                        key: _freeze_sequence(values)
+                        for key, values in self.headernames.items()
+                    }
+                ),
+            )
+        object.__setattr__(self, "_memo", None)
 
-@dataclass(frozen=True)
+    def __reduce__(self):
+        """Pickle the header through its constructor, since read-only mappings cannot be pickled."""
+        values = (getattr(self, f.name) for f in fields(self) if f.init)
+        args = tuple(
+            dict(value) if isinstance(value, MappingProxyType) else value
+            for value in values
+        )
+        return type(self), args
+
+
+def _freeze_sequence(value: Any) -> Any:
+    """
+    Freeze a sequence of a HOA header into a tuple.
+
+    :param value: the sequence, a string, or None.
+    :return: the tuple with the same items, or the value itself if it is not a mutable sequence.
+    """
+    if value is None or isinstance(value, (str, tuple)):
+        return value
+    return tuple(value)
+
+
+@add_slots
+@dataclass(frozen=True, init=False)
 class HOABody:
-    """This class implements a data structure for the HOA file format header."""
+    """
+    This class implements a data structure for the HOA file format body.
+
+    States and edges are stored in two parallel tuples:
+    'edges[i]' are the outgoing edges of the state 'states[i]'.
+    """
+
+    states: Tuple[State, ...]
+    edges: Tuple[Sequence[Edge], ...]
+    _memo: Optional[Dict[str, Any]] = field(
+        init=False, repr=False, compare=False, metadata=TRANSIENT
+    )
+
+    def __init__(
+        self,
+        states: Union[Sequence[State], Mapping[State, Sequence[Edge]]],
+        edges: Optional[Sequence[Sequence[Edge]]] = None,
+    ):
+        """
+        Initialize the HOA body.
+
+        For backward compatibility, the body can also be built from
+        a single mapping from states to their outgoing edges.
+
+        :param states: the states, or the mapping from states to their outgoing edges.
+        :param edges: the outgoing edges of each state, if the states are a sequence.
+        """
+        if isinstance(states, Mapping):
+            assert_(edges is None, "The edges are already given by the mapping.")
+            state2edges = states
+            states, edges = tuple(state2edges.keys()), tuple(state2edges.values())
+        if edges is None:
+            raise TypeError("The edges of the states are missing.")
+        # the body is frozen, and derived data is cached on it:
+        # the sequences must not change behind its back.
+        object.__setattr__(self, "states", tuple(states))
+        object.__setattr__(self, "edges", tuple(map(tuple, edges)))
+        assert_(
+            len(self.states) == len(self.edges),
+            "There must be a sequence of edges for each state.",
+        )
+        object.__setattr__(self, "_memo", None)
+
+    @classmethod
+    def from_state2edges(cls, state2edges: Mapping[State, Sequence[Edge]]) -> "HOABody":
+        """
+        Build the HOA body from a mapping from states to their edges.
+
+        :param state2edges: the mapping from states to their outgoing edges.
+        :return: the HOA body.
+        """
+        return cls(state2edges)
+
+    @property
+    def state2edges(self) -> Mapping[State, Sequence[Edge]]:
+        """
+        Get the read-only mapping from states to their outgoing edges.
+
+        It is built on the first access, and cached on the body.
+        """
+        return _state2edges(self)
+
+    @property
+    def index2edges(self) -> Mapping[int, Sequence[Edge]]:
+        """
+        Get the read-only mapping from state indices to their outgoing edges.
+
+        Unlike 'state2edges', the keys are plain integers,
+        so building and querying the mapping never hashes a state.
+        It is built on the first access, and cached on the body.
+        """
+        return _index2edges(self)
+
+    @property
+    def accepting_sets_mask(self) -> int:
+        """
+        Get the accepting sets used by the states and edges, as a bitmask.
+
+        It is computed on the first access, and cached on the body.
+        """
+        return _body_accepting_sets_mask(self)
+
+    @property
+    def propositions(self) -> FrozenSet[int]:
+        """
+        Get the propositions occurring in the labels of the states and edges.
+
+        They are computed on the first access, and cached on the body.
+        """
+        return _body_propositions(self)
+
+    def to_arrays(self) -> "HOABodyArrays":
+        """Get the structure-of-arrays representation of the edges."""
+        return HOABodyArrays.from_body(self)
+
+
+@memoized
+def _state2edges(body: HOABody) -> Mapping[State, Sequence[Edge]]:
+    """
+    Build the mapping from the states of a HOA body to their outgoing edges.
+
+    :param body: the HOA body.
+    :return: the read-only mapping.
+    """
+    return MappingProxyType(dict(zip(body.states, body.edges)))
+
+
+@memoized
+def _index2edges(body: HOABody) -> Mapping[int, Sequence[Edge]]:
+    """
+    Build the mapping from the state indices of a HOA body to their outgoing edges.
+
+    :param body: the HOA body.
+    :return: the read-only mapping.
+    """
+    return MappingProxyType(
+        {state.index: edges for state, edges in zip(body.states, body.edges)}
+    )
+
+
+@memoized
+def _body_accepting_sets_mask(body: HOABody) -> int:
+    """
+    Compute the accepting sets used by the states and edges of a HOA body, as a bitmask.
+
+    The parser shares equal acceptance signatures among states and edges,
+    hence each distinct signature object is converted only once.
+
+    :param body: the HOA body.
+    :return: the bitmask whose i-th bit is set iff the accepting set i is used.
+    """
+    signatures: Dict[int, AbstractSet[int]] = {}
+    for state, edges in zip(body.states, body.edges):
+        if state.acc_sig:
+            signatures[id(state.acc_sig)] = state.acc_sig
+        for edge in edges:
+            if edge.acc_sig:
+                signatures[id(edge.acc_sig)] = edge.acc_sig
+    mask = 0
+    for signature in signatures.values():
+        for acceptance_set in signature:
+            mask |= 1 << acceptance_set
+    return mask
+
+
+@memoized
+def _body_propositions(body: HOABody) -> FrozenSet[int]:
+    """
+    Compute the propositions occurring in a HOA body.
+
+    The parser shares equal labels among states and edges,
+    hence each distinct label object is visited only once.
+
+    :param body: the HOA body.
+    :return: the set of propositions.
+    """
+    labels: Dict[int, LabelExpression] = {}
+    for state, edges in zip(body.states, body.edges):
+        if state.label is not None:
+            labels[id(state.label)] = state.label
+        for edge in edges:
+            if edge.label is not None:
+                labels[id(edge.label)] = edge.label
+    mask = 0
+    for label in labels.values():
+        mask |= propositions_mask(label)
+    return set_bits(mask)
+
+
+@add_slots
+@dataclass(frozen=True)
+class HOABodyArrays:
+    """
+    This class stores the edges of a HOA body as parallel arrays.
+
+    Each edge field is kept in its own array, so that a pass over one field
+    (e.g. the successors, for reachability) does not touch the others.
+    Indices are in compressed sparse row form:
+
+    - the edges of 'states[i]' are those in 'range(edge_ptr[i], edge_ptr[i + 1])';
+    - the target states of the edge 'j' are
+      'target_indices[target_ptr[j]:target_ptr[j + 1]]'.
+    """
+
+    states: Tuple[State, ...]
+    edge_ptr: array
+    target_ptr: array
+    target_indices: array
+    labels: Tuple[Optional[LabelExpression], ...]
+    acc_sigs: Tuple[Optional[AbstractSet[int]], ...]
+
+    @classmethod
+    def from_body(cls, body: HOABody) -> "HOABodyArrays":
+        """
+        Build the arrays from a HOA body.
+
+        :param body: the HOA body.
+        :return: the structure-of-arrays representation of its edges.
+        """
+        edge_ptr = array("l", [0])
+        target_ptr = array("l", [0])
+        target_indices = array("l")
+        labels = []
+        acc_sigs = []
+        for edges in body.edges:
+            for edge in edges:
+                target_indices.extend(edge.state_conj)
+                target_ptr.append(len(target_indices))
+                labels.append(edge.label)
+                acc_sigs.append(edge.acc_sig)
+            edge_ptr.append(len(labels))
+        return cls(
+            body.states,
+            edge_ptr,
+            target_ptr,
+            target_indices,
+            tuple(labels),
+            tuple(acc_sigs),
+        )
+
+    @property
+    def nb_edges(self) -> int:
+        """Get the number of edges."""
+        return len(self.labels)
+
+    def successors(self, edge: int) -> array:
+        """
+        Get the target states of an edge.
+
+        :param edge: the position of the edge.
+        :return: the indices of the target states.
+        """
+        start, end = self.target_ptr[edge], self.target_ptr[edge + 1]
+        return self.target_indices[start:end]
+
+    def edge(self, edge: int) -> Edge:
+        """
+        Rebuild an edge from the arrays.
 
-    state2edges: Dict[State, Sequence[Edge]]
+        :param edge: the position of the edge.
+        :return: the edge.
+        """
+        return Edge(
+            tuple(self.successors(edge)),
+            label=self.labels[edge],
+            acc_sig=self.acc_sigs[edge],
+        )
 
 
+@add_slots
 @dataclass(frozen=True)
 class HOA:
     """This class implements a data structure for the HOA file format."""
@@ -17,23 +17,112 @@
 
 """This module contains utilities to dump the HOA objects."""
 from functools import singledispatch
-from typing import TextIO
+from typing import AbstractSet, FrozenSet, Iterator, TextIO, Tuple
 
-from hoa.ast.acceptance import nb_accepting_sets
 from hoa.core import Edge, HOA, HOABody, HOAHeader, State
+from hoa.helpers.base import memoized
 from hoa.printers import acceptance_condition_to_string, label_expression_to_string
 from hoa.types import acceptance_parameter, hoa_header_value
 
 
+class _IntStrings(dict):
+    """Map integers to their string form, computing each of them only once."""
+
+    def __missing__(self, key: int) -> str:
+        """Stringify an integer not seen before."""
+        value = self[key] = str(key)
+        return value
+
+
+class _StateConjStrings(dict):
+    """Map state conjunctions to their string form, followed by a space."""
+
+    def __init__(self, int_strings: _IntStrings):
+        """Initialize the mapping, given the strings of the state indices."""
+        super().__init__()
+        self._int_strings = int_strings
+
+    def __missing__(self, key: Tuple[int, ...]) -> str:
+        """Stringify a state conjunction not seen before."""
+        value = self[key] = f"{'&'.join(map(self._int_strings.__getitem__, key))} "
+        return value
+
+
+def _format_acc_sig(acc_sig: AbstractSet[int], int_strings: _IntStrings) -> str:
+    """Stringify an acceptance signature."""
+    return f"{{{' '.join(map(int_strings.__getitem__, acc_sig))}}}"
+
+
+class _AccSigStrings(dict):
+    """Map acceptance signatures to their string form, computing each of them only once."""
+
+    def __init__(self, int_strings: _IntStrings):
+        """Initialize the mapping, given the strings of the acceptance sets."""
+        super().__init__()
+        self._int_strings = int_strings
+
+    def __missing__(self, key: FrozenSet[int]) -> str:
+        """Stringify an acceptance signature not seen before."""
+        value = self[key] = _format_acc_sig(key, self._int_strings)
+        return value
+
+
+class _BodyStrings:
+    """
+    The strings of the values that repeat on many states and edges.
+
+    They are cached for a single dump, so they are dropped with it.
+    """
+
+    __slots__ = ("ints", "state_conjs", "acc_sigs")
+
+    def __init__(self):
+        """Initialize the empty caches."""
+        self.ints = _IntStrings()
+        self.state_conjs = _StateConjStrings(self.ints)
+        self.acc_sigs = _AccSigStrings(self.ints)
+
+    def acc_sig(self, acc_sig: AbstractSet[int]) -> str:
+        """Get the string form of an acceptance signature."""
+        # the parser shares equal acceptance signatures, which are frozensets.
+        if type(acc_sig) is frozenset:
+            return self.acc_sigs[acc_sig]
+        # e.g. a mutable set, which cannot be a key.
+        return _format_acc_sig(acc_sig, self.ints)
+
+
+# separator of quoted strings; f-string expressions cannot contain quotes before Python 3.12.
+_QUOTED_SEPARATOR = '" "'
+
+
 def dump(hoa: HOA, fp: TextIO) -> None:
     """
     Dump the data to a file.
 
+    The body is written state by state, without building
+    the whole output in memory.
+
     :param hoa: the HOA object.
     :param fp: the file pointer.
     :return: None.
     """
-    fp.write(dumps(hoa))
+    fp.writelines(iter_dump(hoa))
+
+
+def iter_dump(hoa: HOA) -> Iterator[str]:
+    """
+    Iterate over the fragments of the HOA format representation.
+
+    The fragments are the header, the body delimiters, and each state
+    with its edges; their concatenation is 'dumps(hoa)'.
+
+    :param hoa: the HOA object.
+    :return: the iterator over the fragments.
+    """
+    yield _dump_header(hoa.header)
+    yield "--BODY--\n"
+    yield from _iter_body(hoa.body)
+    yield "--END--"
 
 
 @singledispatch
@@ -48,130 +137,150 @@ def dumps(obj):
 
 
 @dumps.register  # type: ignore
-def _(hoa: HOA) -> str:
+def _dump_hoa(hoa: HOA) -> str:
     """
     Dump the data into a string in HOA format.
 
     :param hoa: the HOA object.
     :return: the string in HOA format.
     """
-    header = dumps(hoa.header)
-    body = dumps(hoa.body)
-    return header + "--BODY--\n" + body + "--END--"
+    # the body is joined with the header, so it is not copied twice.
+    return "".join(iter_dump(hoa))
 
 
 @dumps.register  # type: ignore
-def _(hoa_header: HOAHeader):
+@memoized
+def _dump_header(hoa_header: HOAHeader) -> str:
     """
     Dump the data into a string in HOA format.
 
+    The header is immutable, hence the result is cached on it.
+
     :param hoa_header: the HOA header.
     :return: the string in HOA format.
     """
-    s = "HOA: {}\n".format(hoa_header.format_version)
+    parts = [f"HOA: {hoa_header.format_version}\n"]
     if hoa_header.nb_states is not None:
-        s += "States: {}\n".format(hoa_header.nb_states)
+        parts.append(f"States: {hoa_header.nb_states}\n")
     if hoa_header.start_states is not None:
-        s += (
-            "\n".join(
-                "Start: {}".format(" & ".join(map(str, start_state_set)))
-                for start_state_set in hoa_header.start_states
-            )
-            + "\n"
+        parts.extend(
+            f"Start: {' & '.join(map(str, start_state_set))}\n"
+            for start_state_set in hoa_header.start_states
         )
-    if hoa_header.propositions is not None and len(hoa_header.propositions) > 0:
-        propositions_string = '"' + '" "'.join(p for p in hoa_header.propositions) + '"'
-        s += "AP: {nb} {prop}\n".format(
-            nb=len(hoa_header.propositions), prop=propositions_string
+    # the optional sequences are skipped both when missing and when empty.
+    propositions = hoa_header.propositions
+    if propositions:
+        parts.append(
+            f'AP: {len(propositions)} "{_QUOTED_SEPARATOR.join(propositions)}"\n'
         )
-    if hoa_header.aliases is not None and len(hoa_header.aliases) > 0:
-        s += (
-            "\n".join(
-                [
-                    "Alias: {} {}".format(
-                        alias_label.alias,
-                        label_expression_to_string(alias_label.expression),
-                    )
-                    for alias_label in hoa_header.aliases
-                ]
-            )
-            + "\n"
+    if hoa_header.aliases:
+        parts.extend(
+            f"Alias: {alias_label.alias} "
+            f"{label_expression_to_string(alias_label.expression)}\n"
+            for alias_label in hoa_header.aliases
         )
     acceptance_str = acceptance_condition_to_string(hoa_header.acceptance.condition)
-    nb_accepting_sets_ = nb_accepting_sets(hoa_header.acceptance.condition)
-    s += f"Acceptance: {nb_accepting_sets_} {acceptance_str}\n"
+    nb_accepting_sets_ = hoa_header.acceptance.nb_accepting_sets
+    parts.append(f"Acceptance: {nb_accepting_sets_} {acceptance_str}\n")
     if hoa_header.acceptance.name is not None:
-        s += "acc-name: {} {}\n".format(
-            hoa_header.acceptance.name,
-            " ".join(
-                map(
-                    acceptance_parameter.to_acceptance_parameter,
-                    hoa_header.acceptance.parameters,
-                )
-            ),
+        parameters_str = " ".join(
+            map(
+                acceptance_parameter.to_acceptance_parameter,
+                hoa_header.acceptance.parameters,
+            )
         )
+        parts.append(f"acc-name: {hoa_header.acceptance.name} {parameters_str}\n")
     if hoa_header.tool is not None:
-        s += "tool: {}\n".format(" ".join(hoa_header.tool))
+        parts.append(f"tool: {' '.join(hoa_header.tool)}\n")
     if hoa_header.name is not None:
-        s += 'name: "{}"\n'.format(hoa_header.name)
-    if hoa_header.properties is not None and len(hoa_header.properties) > 0:
-        s += "properties: {}\n".format(" ".join(hoa_header.properties))
-    if hoa_header.headernames is not None and len(hoa_header.headernames) > 0:
-        s += (
-            "\n".join(
-                [
-                    "{}: {}".format(
-                        key, " ".join(map(hoa_header_value.to_hoa_header_value, values))
-                    )
-                    for key, values in hoa_header.headernames.items()
-                ]
-            )
-            + "\n"
+        parts.append(f'name: "{hoa_header.name}"\n')
+    if hoa_header.properties:
+        parts.append(f"properties: {' '.join(hoa_header.properties)}\n")
+    if hoa_header.headernames:
+        parts.extend(
+            f"{key}: {' '.join(map(hoa_header_value.to_hoa_header_value, values))}\n"
+            for key, values in hoa_header.headernames.items()
         )
 
-    return s
+    return "".join(parts)
 
 
 @dumps.register  # type: ignore
-def _(hoa_body: HOABody):
+def _dump_body(hoa_body: HOABody) -> str:
     """
     Dump the data into a string in HOA format.
 
     :param hoa_body: the HOA body.
     :return: the string in HOA format.
     """
-    return (
-        "\n".join(
-            [
-                dumps(state) + "\n" + "\n".join(map(dumps, edges))
-                for state, edges in hoa_body.state2edges.items()
-            ]
-        )
-        + "\n"
-    )
+    return "".join(_iter_body(hoa_body))
+
+
+def _iter_body(hoa_body: HOABody) -> Iterator[str]:
+    """
+    Iterate over the HOA body fragment by fragment.
+
+    :param hoa_body: the HOA body.
+    :return: the iterator over the fragments.
+    """
+    # call the dumpers directly: going through the singledispatch
+    # lookup for every state and edge is wasted work.
+    # Each state is yielded with its edges in a single fragment,
+    # which saves a call to 'write' per line; the trailing empty
+    # line makes the join end with a newline.
+    # The state indices, the state conjunctions and the acceptance
+    # signatures repeat a lot: their strings are cached for this body only.
+    strings = _BodyStrings()
+    for state, edges in zip(hoa_body.states, hoa_body.edges):
+        lines = [_state_to_string(state, strings)]
+        lines.extend(_edge_to_string(edge, strings) for edge in edges)
+        lines.append("")
+        yield "\n".join(lines)
 
 
 @dumps.register  # type: ignore
-def _(state: State) -> str:
+def _dump_state(state: State) -> str:
     """Get the HOA format representation of the state."""
-    s = "State: "
+    return _state_to_string(state, _BodyStrings())
+
+
+def _state_to_string(state: State, strings: _BodyStrings) -> str:
+    """
+    Get the HOA format representation of the state.
+
+    :param state: the state.
+    :param strings: the cache of the strings of the body.
+    :return: the string in HOA format.
+    """
+    parts = ["State: "]
     if state.label is not None:
-        s += "[" + label_expression_to_string(state.label) + "]" + " "
-    s += str(state.index) + " "
+        parts.append(f"[{label_expression_to_string(state.label)}] ")
+    parts.append(f"{strings.ints[state.index]} ")
     if state.name is not None:
-        s += '"' + state.name + '"' + " "
+        parts.append(f'"{state.name}" ')
     if state.acc_sig is not None:
-        s += "{" + " ".join(map(str, state.acc_sig)) + "}"
-    return s
+        parts.append(strings.acc_sig(state.acc_sig))
+    return "".join(parts)
 
 
 @dumps.register  # type: ignore
-def _(edge: Edge) -> str:
+def _dump_edge(edge: Edge) -> str:
     """Get the HOA format representation of the edge."""
-    s = ""
+    return _edge_to_string(edge, _BodyStrings())
+
+
+def _edge_to_string(edge: Edge, strings: _BodyStrings) -> str:
+    """
+    Get the HOA format representation of the edge.
+
+    :param edge: the edge.
+    :param strings: the cache of the strings of the body.
+    :return: the string in HOA format.
+    """
+    parts = []
     if edge.label is not None:
-        s += "[" + label_expression_to_string(edge.label) + "]" + " "
-    s += "&".join(map(str, edge.state_conj)) + " "
+        parts.append(f"[{label_expression_to_string(edge.label)}] ")
+    parts.append(strings.state_conjs[edge.state_conj])
     if edge.acc_sig is not None:
-        s += "{" + " ".join(map(str, edge.acc_sig)) + "}"
-    return s
+        parts.append(strings.acc_sig(edge.acc_sig))
+    return "".join(parts)
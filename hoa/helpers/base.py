@@ -18,6 +18,12 @@
 """This module contains helper functions."""
 
 import re
+from dataclasses import Field, fields, FrozenInstanceError
+from functools import wraps
+from types import MappingProxyType
+from typing import Any, Callable, FrozenSet, TypeVar
+
+R = TypeVar("R")
 
 
 def assert_(condition: bool, message: str = ""):
@@ -35,19 +41,23 @@ class RegexConstrainedString(str):
     attribute to implement a different behaviour.
     """
 
+    __slots__ = ()
     REGEX = re.compile(".*", flags=re.DOTALL)
 
     def __new__(cls, value, *args, **kwargs):
         """Instantiate a new object."""
-        if type(value) == cls:
+        if type(value) is cls:
             return value
         else:
             inst = super(RegexConstrainedString, cls).__new__(cls, value)
             return inst
 
-    def __init__(self, *_, **__):
+    def __init__(self, *args, **__):
         """Initialize a regex constrained string."""
         super().__init__()
+        if args and args[0] is self:
+            # __new__ returned the value itself, which was already validated.
+            return
         if not self.REGEX.match(self):
             self._handle_no_match()
 
@@ -61,3 +71,131 @@ class RegexConstrainedString(str):
     def __instancecheck__(self, instance) -> bool:
         """Check if a string satisfies the regex constraint."""
         return isinstance(instance, str) and self.REGEX.match(instance) is not None
+
+
+# metadata of the dataclass fields that are not pickled, e.g. cached hashes,
+# which are not valid in another process. They are set to None when unpickling.
+TRANSIENT = MappingProxyType({"transient": True})
+
+
+def _is_transient(f: Field) -> bool:
+    """Check whether a dataclass field is transient."""
+    return f.metadata.get("transient", False)
+
+
+def _dataclass_getstate(self):
+    """Get the state of a slotted dataclass, for pickling."""
+    return [getattr(self, f.name) for f in fields(self) if not _is_transient(f)]
+
+
+def _dataclass_setstate(self, state):
+    """Set the state of a slotted dataclass, for unpickling."""
+    values = iter(state)
+    for f in fields(self):
+        value = None if _is_transient(f) else next(values)
+        # use object.__setattr__ since the dataclass might be frozen.
+        object.__setattr__(self, f.name, value)
+
+
+def _frozen_setattr(self, name, _value):
+    """Forbid the assignment of attributes of a frozen dataclass."""
+    raise FrozenInstanceError(f"cannot assign to field {name!r}")
+
+
+def _frozen_delattr(self, name):
+    """Forbid the deletion of attributes of a frozen dataclass."""
+    raise FrozenInstanceError(f"cannot delete field {name!r}")
+
+
+def add_slots(cls):
+    """
+    Add '__slots__' to a dataclass.
+
+    'dataclass(slots=True)' is only available from Python 3.10;
+    this decorator re-creates the class with a '__slots__' attribute
+    made of its fields. It must be applied on top of the 'dataclass' decorator.
+
+    :param cls: the dataclass.
+    :return: the new class, endowed with '__slots__'.
+    """
+    if "__slots__" in cls.__dict__:
+        raise TypeError(f"{cls.__name__} already specifies __slots__")
+    cls_dict = dict(cls.__dict__)
+    field_names = tuple(f.name for f in fields(cls))
+    cls_dict["__slots__"] = field_names
+    for field_name in field_names:
+        # remove the default values, they would clash with the slots.
+        cls_dict.pop(field_name, None)
+    cls_dict.pop("__dict__", None)
+    cls_dict.pop("__weakref__", None)
+    qualname = getattr(cls, "__qualname__", None)
+    cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    if qualname is not None:
+        cls.__qualname__ = qualname
+    if cls.__dataclass_params__.frozen:
+        # the generated methods refer to the old class, hence replace them.
+        cls.__setattr__ = _frozen_setattr
+        cls.__delattr__ = _frozen_delattr
+    # the default pickling of slotted objects uses setattr, which fails on frozen dataclasses.
+    cls.__getstate__ = _dataclass_getstate
+    cls.__setstate__ = _dataclass_setstate
+    return cls
+
+
+def memoized(function: Callable[[Any], R]) -> Callable[[Any], R]:
+    """
+    Cache the result of a function of an immutable object on the object itself.
+
+    The objects opt in with a '_memo' slot initialized to None, e.g. the
+    boolean operations; the result is stored there the first time it is
+    computed, and the next calls are a dict lookup, without hashing the
+    object as 'functools.lru_cache' would do. The results for the other
+    objects, e.g. the leaves of a formula, are not cached.
+
+    :param function: the function of an object.
+    :return: the memoized function.
+    """
+    key = f"{function.__module__}.{function.__qualname__}"
+
+    @wraps(function)
+    def wrapper(obj: Any) -> R:
+        try:
+            memo = obj._memo
+        except AttributeError:
+            return function(obj)
+        if memo is None:
+            memo = {}
+            object.__setattr__(obj, "_memo", memo)
+        try:
+            return memo[key]
+        except KeyError:
+            result = memo[key] = function(obj)
+            return result
+
+    return wrapper
+
+
+_NO_BITS: FrozenSet[int] = frozenset()
+
+
+def set_bits(mask: int) -> FrozenSet[int]:
+    """
+    Decode a bitmask into the set of the positions of its bits set to 1.
+
+    The lowest bit set is popped at each round, so the loop runs
+    once per element, whatever the width of the mask.
+
+    >>> sorted(set_bits(0b10110))
+    [1, 2, 4]
+
+    :param mask: the non-negative bitmask.
+    :return: the positions of the bits set; the same empty set for 0.
+    """
+    if not mask:
+        return _NO_BITS
+    result = []
+    while mask:
+        lowest = mask & -mask
+        result.append(lowest.bit_length() - 1)
+        mask ^= lowest
+    return frozenset(result)
@@ -17,29 +17,39 @@
 
 """This module contains the definition of the HOA parser."""
 
-import operator
 import os
-from collections import OrderedDict
 from enum import Enum
-from functools import reduce
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
 
 from lark import Lark, Transformer, Tree
 
 from hoa.ast.acceptance import (
-    AcceptanceAtom,
+    Acceptance,
     accepting_sets,
+    ATOM_NAMES,
     AtomType,
+    Fin,
+    Inf,
     nb_accepting_sets,
+    NotFin,
+    NotInf,
+)
+from hoa.ast.boolean_expression import (
+    And,
+    FalseFormula,
+    Or,
+    PositiveAnd,
+    PositiveOr,
+    TrueFormula,
 )
-from hoa.ast.boolean_expression import FalseFormula, TrueFormula
 from hoa.ast.label import LabelAlias, LabelAtom, LabelExpression
-from hoa.core import Acceptance, Edge, HOA, HOABody, HOAHeader, State
+from hoa.core import Edge, HOA, HOABody, HOAHeader, State
 from hoa.helpers.base import assert_
 from hoa.types import (
     acceptance_parameter,
     HEADER_VALUES,
+    headername,
     hoa_header_value,
     identifier,
     string,
@@ -61,6 +71,33 @@ class HeaderItemType(Enum):
     HEADERNAME = "headername"
 
 
+# header items that may occur more than once, and whose values are merged.
+_MULTI_HEADERS = frozenset({HeaderItemType.ALIAS, HeaderItemType.PROPERTIES})
+
+
+# factories of the acceptance atoms, by atom type.
+_ACCEPTANCE_ATOM_FACTORIES = {AtomType.FINITE: Fin, AtomType.INFINITE: Inf}
+_NEGATED_ACCEPTANCE_ATOM_FACTORIES = {
+    AtomType.FINITE: NotFin,
+    AtomType.INFINITE: NotInf,
+}
+# atom types by name, to skip the enum lookup machinery.
+_ATOM_TYPE_BY_NAME = dict(zip(ATOM_NAMES, (AtomType.FINITE, AtomType.INFINITE)))
+
+
+def _atom_type(name: str) -> AtomType:
+    """
+    Get the atom type from its name.
+
+    :param name: the name of the atom type, i.e. 'Fin' or 'Inf'.
+    :return: the atom type.
+    """
+    try:
+        return _ATOM_TYPE_BY_NAME[name]
+    except KeyError:
+        raise ValueError(f"Atom type '{name}' not valid.") from None
+
+
 class HOATransformer(Transformer):
     """The transformer of the AST of the tool to a more handy data structure."""
 
@@ -69,20 +106,46 @@ class HOATransformer(Transformer):
         super().__init__(visit_tokens=True)
 
         self._aliases: Dict[str, LabelExpression] = dict()
+        # the canonical label expressions, so that equal subexpressions share the same object.
+        self._labels: Dict[LabelExpression, LabelExpression] = dict()
+        # the canonical state conjunctions, so that equal targets share the same tuple.
+        self._state_conjs: Dict[Tuple[int, ...], Tuple[int, ...]] = dict()
+        # the canonical acceptance signatures, so that equal signatures share the same object.
+        self._acc_sigs: Dict[FrozenSet[int], FrozenSet[int]] = dict()
+        # the canonical acceptance signatures, by their sequence of acceptance sets as parsed.
+        self._acc_sigs_by_sets: Dict[Tuple[int, ...], FrozenSet[int]] = dict()
+
+    def _canonical_label(self, label: LabelExpression) -> LabelExpression:
+        """Get the canonical label expression equal to the given one."""
+        return self._labels.setdefault(label, label)
+
+    def _canonical_acc_sig(self, acceptance_sets: Iterable[int]) -> FrozenSet[int]:
+        """
+        Get the canonical frozenset of an acceptance signature.
+
+        A signature already seen in the same order costs a lookup by tuple,
+        without building a new frozenset.
+
+        :param acceptance_sets: the acceptance sets of the signature.
+        :return: the interned frozenset of acceptance sets.
+        """
+        key = tuple(acceptance_sets)
+        acc_sig = self._acc_sigs_by_sets.get(key)
+        if acc_sig is None:
+            acc_sig = frozenset(key)
+            acc_sig = self._acc_sigs.setdefault(acc_sig, acc_sig)
+            self._acc_sigs_by_sets[key] = acc_sig
+        return acc_sig
 
     INT = int
     STRING = string
     IDENTIFIER = identifier
-    HEADERNAME = identifier
+    BOOLEAN = {"t": True, "f": False}.__getitem__
 
-    def BOOLEAN(self, args):
-        """Define BOOLEAN types."""
-        label = args[0]
-        if label == "t":
-            return True
-        if label == "f":
-            return False
-        raise ValueError("Should not be here.")
+    def HEADERNAME(self, token):
+        """Parse a HEADERNAME token, stripping its colon."""
+        # unlike identifiers, header names can be 't' and 'f'.
+        return headername(token[:-1])
 
     def start(self, args):
         """Parse the 'start' node."""
@@ -115,10 +178,7 @@ class HOATransformer(Transformer):
         headertype2value: Dict[HeaderItemType, Any] = {}
         custom_headers: Optional[Dict[identifier, List[HEADER_VALUES]]] = dict()
         for header_item_type, value in args[1:]:
-            if header_item_type in {
-                HeaderItemType.ALIAS,
-                HeaderItemType.PROPERTIES,
-            }:
+            if header_item_type in _MULTI_HEADERS:
                 headertype2value.setdefault(header_item_type, []).extend(
                     value if isinstance(value, list) else [value]
                 )
@@ -134,9 +194,7 @@ class HOATransformer(Transformer):
                 assert (
                     key not in custom_headers
                 ), f"Custom header {key} occurred more than once."
-                custom_headers[key] = list(
-                    map(hoa_header_value.to_header_value, arg_list)
-                )
+                custom_headers[key] = hoa_header_value.classify_many(arg_list)
 
         assert (
             HeaderItemType.ACCEPTANCE in headertype2value
@@ -181,7 +239,7 @@ class HOATransformer(Transformer):
 
     def start_state(self, args):
         """Parse the 'start_state' node."""
-        return HeaderItemType.START_STATES, frozenset(*args[::2])
+        return HeaderItemType.START_STATES, frozenset(args[0])
 
     def propositions(self, args):
         """Parse the 'propositions' node."""
@@ -207,8 +265,9 @@ class HOATransformer(Transformer):
         actual_nb_accepting_sets = nb_accepting_sets(acceptance_condition)
         accepting_sets_ = accepting_sets(acceptance_condition)
         # this checks whether the number of acc. sets in the acceptance condition is correct.
+        # the conditions 't' and 'f' have no accepting sets.
         assert_(
-            max(accepting_sets_)
+            max(accepting_sets_, default=-1)
             == len(accepting_sets_) - 1
             == expected_nb_accepting_sets - 1
             == actual_nb_accepting_sets - 1
@@ -225,7 +284,7 @@ class HOATransformer(Transformer):
 
     def name(self, args):
         """Parse the 'nome' node."""
-        return HeaderItemType.NAME, args[0].strip('"')
+        return HeaderItemType.NAME, args[0][1:-1]
 
     def properties(self, args):
         """Parse the 'automaton' node."""
@@ -238,29 +297,29 @@ class HOATransformer(Transformer):
 
     def body(self, args):
         """Parse the 'body' node."""
-        state2edges: Dict[State, List[Edge]] = OrderedDict({})
-        current_state = None
-        for arg in args:
-            if isinstance(arg, State):
-                current_state = arg
-                state2edges[current_state] = []
-            elif isinstance(arg, Edge):
-                state2edges[current_state].append(arg)
+        if len(args) == 0:
+            return HOABody((), ())
+        states, edges = zip(*args)
+        return HOABody(states, edges)
 
-        return HOABody(state2edges)
+    def state_block(self, args):
+        """Parse the 'state_block' node."""
+        return args[0], tuple(args[1:])
 
     def state_name(self, args):
         """Parse the 'state_name' node."""
-        non_trees = [arg for arg in args if not isinstance(arg, Tree)]
-        kwargs = {arg.data: arg.children[0] for arg in args if isinstance(arg, Tree)}
+        non_trees = [arg for arg in args if type(arg) is not Tree]
+        kwargs = {arg.data: arg.children for arg in args if type(arg) is Tree}
 
-        if "acc_sig" in kwargs.keys():
-            kwargs["acc_sig"] = frozenset({kwargs["acc_sig"]})
+        if "label" in kwargs:
+            kwargs["label"] = kwargs["label"][0]
+        if "acc_sig" in kwargs:
+            kwargs["acc_sig"] = self._canonical_acc_sig(kwargs["acc_sig"])
 
         if len(non_trees) == 1:
             return State(index=non_trees[0], **kwargs)
         elif len(non_trees) == 2:
-            return State(index=non_trees[0], name=non_trees[1].strip('"'), **kwargs)
+            return State(index=non_trees[0], name=non_trees[1][1:-1], **kwargs)
         else:
             raise ValueError("Should not be here.")
 
@@ -271,17 +330,17 @@ class HOATransformer(Transformer):
         elif len(args) == 2:
             # either 'label state_conj' or 'state_conj acc-sig'
             first, second = args
-            if isinstance(first, Tree):
+            if type(first) is Tree:
                 return Edge(second, label=first.children[0])
             else:
                 return Edge(
-                    first, acc_sig=frozenset(second.children)
+                    first, acc_sig=self._canonical_acc_sig(second.children)
                 )  # acc_sig as frozenset()
         elif len(args) == 3:
             label, state_conj, acc_sig = (
                 args[0].children[0],
                 args[1],
-                frozenset(args[2].children),
+                self._canonical_acc_sig(args[2].children),
             )
             return Edge(state_conj, label=label, acc_sig=acc_sig)
         else:
@@ -289,28 +348,21 @@ class HOATransformer(Transformer):
 
     def state_conj(self, args):
         """Parse the 'state_conj' node."""
-        # compute the flat list
-        return list(
-            reduce(
-                operator.add, map(lambda x: [x] if not isinstance(x, list) else x, args)
-            )
-        )
-
-    def label_expr(self, args):
-        """Parse the 'label_expr' node."""
-        return args[0]
+        # the children are already the state indices.
+        state_conj = tuple(args)
+        return self._state_conjs.setdefault(state_conj, state_conj)
 
     def or_label_expr(self, args):
         """Parse the 'or_label_expr' node."""
-        return reduce(operator.or_, args)
+        return self._canonical_label(Or(*args))
 
     def and_label_expr(self, args):
         """Parse the 'and_label_expr' node."""
-        return reduce(operator.and_, args)
+        return self._canonical_label(And(*args))
 
     def not_label_expr(self, args):
         """Parse the 'not_label_expr' node."""
-        return ~args[0]
+        return self._canonical_label(~args[0])
 
     def alias_label_expr(self, args):
         """Parse the 'alias_label_expr' node."""
@@ -320,6 +372,7 @@ class HOATransformer(Transformer):
 
     def atom_label_expr(self, args):
         """Parse the 'atom_label_expr' node."""
+        # label atoms are interned, hence repeated atoms are shared.
         return LabelAtom(args[0])
 
     def boolean_label_expr(self, args):
@@ -332,29 +385,25 @@ class HOATransformer(Transformer):
         else:
             raise ValueError("Should not be here.")
 
-    def acceptance_cond(self, args):
-        """Parse the 'acceptance_cond' node."""
-        return args[0]
-
     def atom_acceptance_cond(self, args):
         """Parse the 'atom_acceptance_cond' node."""
-        atom_type = AtomType(args[0])
+        atom_type = _atom_type(args[0])
         accepting_set = args[1]
-        return AcceptanceAtom(atom_type, accepting_set, False)
+        return _ACCEPTANCE_ATOM_FACTORIES[atom_type](accepting_set)
 
     def not_acceptance_cond(self, args):
         """Parse the 'not_acceptance_cond' node."""
-        atom_type = AtomType(args[0])
+        atom_type = _atom_type(args[0])
         accepting_set = args[1]
-        return AcceptanceAtom(accepting_set, atom_type, True)
+        return _NEGATED_ACCEPTANCE_ATOM_FACTORIES[atom_type](accepting_set)
 
     def and_acceptance_cond(self, args):
         """Parse the 'and_acceptance_cond' node."""
-        return reduce(operator.and_, args)
+        return PositiveAnd(*args)
 
     def or_acceptance_cond(self, args):
         """Parse the 'or_acceptance_cond' node."""
-        return reduce(operator.or_, args)
+        return PositiveOr(*args)
 
     def boolean_acceptance_cond(self, args):
         """Parse the 'boolean_acceptance_cond' node."""
@@ -366,17 +415,24 @@ class HOATransformer(Transformer):
             return FalseFormula()
 
 
+_GRAMMAR_PATH = (
+    Path(os.path.dirname(os.path.realpath(__file__))) / "grammars" / "hoa.lark"
+)
+# the grammar is LALR(1): build the parser table once, and let Lark
+# cache it on disk across interpreter runs.
+_PARSER = Lark(_GRAMMAR_PATH.read_text(), parser="lalr", lexer="contextual", cache=True)
+
+
 class HOAParser:
     """The parser for the HOA format."""
 
     def __init__(self):
         """Initialize the HOA parser."""
-        directory = Path(os.path.dirname(os.path.realpath(__file__)))
-        self._transformer = HOATransformer()
-        self._parser = Lark(open(directory / "grammars" / "hoa.lark"))
+        self._parser = _PARSER
 
     def __call__(self, text: str):
         """Try to parse a string."""
         tree = self._parser.parse(text)
-        result = self._transformer.transform(tree)
+        # the aliases and the canonical labels are specific to each automaton.
+        result = HOATransformer().transform(tree)
         return result
@@ -18,10 +18,74 @@
 """This module contains functions to print acceptance conditions and label expressions."""
 
 from functools import singledispatch
+from typing import Any, Callable, Dict, List
 
-from hoa.ast.acceptance import AcceptanceAtom, AcceptanceCondition
+from hoa.ast.acceptance import AcceptanceAtom, AcceptanceCondition, ATOM_NAMES
 from hoa.ast.boolean_expression import BinaryOp, FalseFormula, TrueFormula, UnaryOp
 from hoa.ast.label import LabelAlias, LabelAtom, LabelExpression
+from hoa.helpers.base import memoized
+
+TRUE_STRING = "t"
+FALSE_STRING = "f"
+
+
+# the separators of the operands of the binary operations, by node type.
+_SEPARATORS: Dict[type, str] = {}
+
+
+def _operation_to_string(f: Any, leaf_to_string: Callable[[Any], str]) -> str:
+    """
+    Transform a boolean operation into a string.
+
+    :param f: the boolean operation.
+    :param leaf_to_string: the function to print the leaves.
+    :return: the string.
+    """
+    out: List[str] = []
+    _emit_operation(f, leaf_to_string, out.append)
+    return "".join(out)
+
+
+def _emit_operation(
+    f: Any, leaf_to_string: Callable[[Any], str], write: Callable[[str], None]
+) -> None:
+    """
+    Write the tokens of a boolean operation to a sink, without recursion.
+
+    The nested operations are expanded with an explicit stack
+    of nodes and pending literals; the other nodes are leaves.
+    Every token is written to the same sink, e.g. the 'append' method
+    of a buffer or the 'write' method of a file, so the string
+    of each subformula is never built on its own.
+
+    :param f: the boolean operation.
+    :param leaf_to_string: the function to print the leaves.
+    :param write: the sink of the tokens.
+    :return: None.
+    """
+    stack: List[Any] = [f]
+    pop, push = stack.pop, stack.append
+    while stack:
+        node = pop()
+        if type(node) is str:
+            write(node)
+        elif isinstance(node, BinaryOp):
+            write("(")
+            push(")")
+            separator = _SEPARATORS.get(type(node))
+            if separator is None:
+                separator = _SEPARATORS[type(node)] = f" {node.SYMBOL} "
+            for i, operand in enumerate(reversed(node.operands)):
+                if i > 0:
+                    push(separator)
+                push(operand)
+        elif isinstance(node, UnaryOp):
+            write("(")
+            write(node.SYMBOL)
+            push(")")
+            push(node.argument)
+        else:
+            write(leaf_to_string(node))
 
 
 @singledispatch
@@ -30,32 +94,55 @@ def acceptance_condition_to_string(_: AcceptanceCondition):
     return str(_)
 
 
+# the printers of the subformulas, by node type. They are resolved once per type
+# from the singledispatch registries, whose lookup is slower than a dict access.
+_ACCEPTANCE_PRINTERS: Dict[type, Callable[[Any], str]] = {}
+
+
+def _acceptance_subformula_to_string(f: AcceptanceCondition) -> str:
+    """Transform a subformula of an acceptance condition into a string."""
+    printer = _ACCEPTANCE_PRINTERS.get(type(f))
+    if printer is None:
+        printer = acceptance_condition_to_string.dispatch(type(f))
+        _ACCEPTANCE_PRINTERS[type(f)] = printer
+    return printer(f)
+
+
+# the prefixes of the acceptance atoms, indexed by 'negated' and by the atom type.
+_ATOM_PREFIXES = (
+    tuple(f"{name}(" for name in ATOM_NAMES),
+    tuple(f"{name}(!" for name in ATOM_NAMES),
+)
+
+
+@memoized
+def _acceptance_operation_to_string(f: AcceptanceCondition) -> str:
+    """Transform an operation over acceptance formulas into a string, once per formula."""
+    return _operation_to_string(f, _acceptance_subformula_to_string)
+
+
 @acceptance_condition_to_string.register  # type: ignore
 def _(f: AcceptanceAtom):
     """Transform an acceptance atom into a string."""
-    return f"{f.atom_type.value}({'!' if f.negated else ''}{f.acceptance_set})"
+    return f"{_ATOM_PREFIXES[f.negated][f.atom_type]}{f.acceptance_set})"
 
 
 @acceptance_condition_to_string.register  # type: ignore
 def _(f: BinaryOp):
     """Transform a binary operation over acceptance formulas into a string."""
-    return (
-        "("
-        + f" {f.SYMBOL} ".join(map(acceptance_condition_to_string, f.operands))
-        + ")"
-    )
+    return _acceptance_operation_to_string(f)
 
 
 @acceptance_condition_to_string.register  # type: ignore
 def _(_acceptance_condition: TrueFormula):
     """Transform true into a string."""
-    return "t"
+    return TRUE_STRING
 
 
 @acceptance_condition_to_string.register  # type: ignore
 def _(_acceptance_condition: FalseFormula):
     """Transform false into a string."""
-    return "f"
+    return FALSE_STRING
 
 
 @singledispatch
@@ -64,6 +151,24 @@ def label_expression_to_string(_: LabelExpression):
     return str(_)
 
 
+_LABEL_PRINTERS: Dict[type, Callable[[Any], str]] = {}
+
+
+def _label_subexpression_to_string(f: LabelExpression) -> str:
+    """Transform a subexpression of a label expression into a string."""
+    printer = _LABEL_PRINTERS.get(type(f))
+    if printer is None:
+        printer = label_expression_to_string.dispatch(type(f))
+        _LABEL_PRINTERS[type(f)] = printer
+    return printer(f)
+
+
+@memoized
+def _label_operation_to_string(f: LabelExpression) -> str:
+    """Transform an operation over label expressions into a string, once per formula."""
+    return _operation_to_string(f, _label_subexpression_to_string)
+
+
 @label_expression_to_string.register  # type: ignore
 def _(f: LabelAtom):
     """Transform a label atom into a string."""
@@ -79,22 +184,22 @@ def _(f: LabelAlias):
 @label_expression_to_string.register  # type: ignore
 def _(f: BinaryOp):
     """Transform a binary operation over labels into a string."""
-    return "(" + f" {f.SYMBOL} ".join(map(label_expression_to_string, f.operands)) + ")"
+    return _label_operation_to_string(f)
 
 
 @label_expression_to_string.register  # type: ignore
 def _(f: UnaryOp):
     """Transform a unary operation over labels into a string."""
-    return f"({f.SYMBOL}{label_expression_to_string(f.argument)})"
+    return _label_operation_to_string(f)
 
 
 @label_expression_to_string.register  # type: ignore
 def _(_f: TrueFormula):
     """Transform a true formula into a string."""
-    return "t"
+    return TRUE_STRING
 
 
 @label_expression_to_string.register  # type: ignore
 def _(_f: FalseFormula):
     """Transform a false formula into a string."""
-    return "f"
+    return FALSE_STRING
@@ -18,38 +18,169 @@
 
 
 """This is the command line tool for translating HOA to DOT format."""
+import argparse
+import contextlib
+import hashlib
+import os
+import pickle  # nosec
+import sys
+import tempfile
 from pathlib import Path
+from typing import Optional, Sequence
 
-import click
-
+from hoa.__version__ import __version__
 from hoa.core import HOA
-from hoa.dumpers import dumps
+from hoa.dumpers import dump
 from hoa.parsers import HOAParser
 
+# the maximum number of parsed automata kept in the cache directory.
+CACHE_SIZE = 128
+# the version of the layout of the pickled automata, whose states are
+# positional tuples: bump it whenever the fields of the pickled classes change.
+CACHE_FORMAT = 3
+
+
+def _cache_key(data: bytes) -> str:
+    """
+    Compute the cache key of a HOA file.
+
+    The package version and the cache format are part of the key,
+    so that automata pickled with another layout are not loaded.
+
+    :param data: the content of the HOA file.
+    :return: the cache key.
+    """
+    prefix = f"{__version__}\0{CACHE_FORMAT}\0".encode()
+    digest = hashlib.blake2b(prefix + data, digest_size=16)
+    return digest.hexdigest()
+
+
+def _load_cached(cache_dir: Path, key: str) -> Optional[HOA]:
+    """
+    Load a parsed automaton from the cache.
+
+    :param cache_dir: the cache directory.
+    :param key: the cache key.
+    :return: the automaton, or None if it is not in the cache.
+    """
+    path = cache_dir / f"{key}.pkl"
+    try:
+        with path.open("rb") as fin:
+            hoa_obj = pickle.load(fin)  # nosec
+    except Exception:  # pylint: disable=broad-except
+        return None
+    if not isinstance(hoa_obj, HOA):
+        return None
+    # the most recently used entries are the last to be evicted;
+    # on a read-only cache directory, the entry is still used.
+    with contextlib.suppress(OSError):
+        path.touch()
+    return hoa_obj
+
+
+def _store_cached(cache_dir: Path, key: str, hoa_obj: HOA) -> None:
+    """
+    Store a parsed automaton in the cache, evicting the least recently used ones.
+
+    The cache is best-effort: if the automaton cannot be stored,
+    e.g. because the directory is read-only or the disk is full,
+    it is not cached, and no partial entry is left behind.
+
+    :param cache_dir: the cache directory.
+    :param key: the cache key.
+    :param hoa_obj: the automaton.
+    :return: None.
+    """
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    except OSError:
+        return
+    stored = False
+    try:
+        with os.fdopen(fd, "wb") as fout:
+            pickle.dump(hoa_obj, fout)
+        # atomic, so that concurrent runs never read a partial entry.
+        os.replace(temp_path, cache_dir / f"{key}.pkl")
+        stored = True
+        _evict_cached(cache_dir)
+    except Exception:  # pylint: disable=broad-except
+        pass
+    finally:
+        if not stored:
+            with contextlib.suppress(OSError):
+                os.unlink(temp_path)
 
-@click.command()
-@click.argument(
-    "input_file",
-    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True),
-)
-@click.option(
-    "-o",
-    "--output",
-    type=click.Path(file_okay=True, dir_okay=False, writable=True),
-    help="Path to the output file.",
-)
-def main(input_file, output):
-    """Parse and validate a HOA file."""
-    input_string = Path(input_file).read_text()
-    file = Path(output) if output is not None else None
-    parser = HOAParser()
-    hoa_obj: HOA = parser(input_string)
-
-    if output is None:
-        print(dumps(hoa_obj))
+
+def _evict_cached(cache_dir: Path) -> None:
+    """
+    Evict the least recently used automata, beyond the first 'CACHE_SIZE' ones.
+
+    :param cache_dir: the cache directory.
+    :return: None.
+    """
+    entries = sorted(cache_dir.glob("*.pkl"), key=lambda entry: entry.stat().st_mtime)
+    for entry in entries[:-CACHE_SIZE]:
+        entry.unlink()
+
+
+def _make_argument_parser() -> argparse.ArgumentParser:
+    """Make the command line argument parser."""
+    parser = argparse.ArgumentParser(
+        prog="pyhoafparser", description="Parse and validate a HOA file."
+    )
+    parser.add_argument("input_file", type=Path, help="Path to the HOA file.")
+    parser.add_argument(
+        "-o", "--output", type=Path, default=None, help="Path to the output file."
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="Directory where to cache the parsed automata, keyed by file content.",
+    )
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Parse and validate a HOA file.
+
+    :param argv: the command line arguments; by default, those of the process.
+    :return: None.
+    """
+    argument_parser = _make_argument_parser()
+    args = argument_parser.parse_args(argv)
+    if not args.input_file.is_file():
+        argument_parser.error(f"file '{args.input_file}' does not exist.")
+
+    hoa_obj = _parse(args.input_file, args.cache_dir)
+    if args.output is None:
+        dump(hoa_obj, sys.stdout)
+        print()
     else:
-        with file.open(mode="w") as fout:
-            print(dumps(hoa_obj), file=fout)
+        with args.output.open(mode="w") as fout:
+            dump(hoa_obj, fout)
+            print(file=fout)
+
+
+def _parse(input_file: Path, cache_dir: Optional[Path]) -> HOA:
+    """
+    Parse a HOA file, going through the cache if a cache directory is given.
+
+    :param input_file: the HOA file.
+    :param cache_dir: the cache directory, or None.
+    :return: the automaton.
+    """
+    if cache_dir is None:
+        return HOAParser()(input_file.read_text())
+
+    key = _cache_key(input_file.read_bytes())
+    hoa_obj = _load_cached(cache_dir, key)
+    if hoa_obj is None:
+        hoa_obj = HOAParser()(input_file.read_text())
+        _store_cached(cache_dir, key, hoa_obj)
+    return hoa_obj
 
 
 if __name__ == "__main__":
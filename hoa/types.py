@@ -16,7 +16,19 @@
 #
 """This module defines useful custom types."""
 import re
-from typing import Union
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    cast,
+    Dict,
+    Iterable,
+    List,
+    Pattern,
+    Tuple,
+    Type,
+    Union,
+)
 
 from hoa.helpers.base import RegexConstrainedString
 
@@ -28,6 +40,7 @@ class string(RegexConstrainedString):
     It must match the following regex: '(\\.|[^\\"])*'.
     """
 
+    __slots__ = ()
     REGEX = re.compile('(\\.|[^\\"])*')
 
 
@@ -38,9 +51,14 @@ class integer(RegexConstrainedString):
     It must match the following regex: "0|[1-9][0-9]*".
     """
 
+    __slots__ = ()
     REGEX = re.compile(r"0|[1-9][0-9]*")
 
 
+# the instances of 'boolean', one per value.
+_BOOLEANS: Dict[str, "boolean"] = {}
+
+
 class boolean(RegexConstrainedString):
     """
     This type represents a 'boolean' in a HOA file.
@@ -48,17 +66,34 @@ class boolean(RegexConstrainedString):
     It must match the following regex: "[tf]".
     """
 
+    __slots__ = ()
     REGEX = re.compile("[tf]")
 
+    def __new__(cls, value, *args, **kwargs):
+        """Return the shared instance of 't' or 'f'."""
+        instance = _BOOLEANS.get(value) if type(value) in (str, cls) else None
+        if instance is None:
+            if value != "t" and value != "f":
+                raise ValueError(
+                    f"Value '{value}' does not match the regular expression {cls.REGEX}"
+                )
+            instance = _BOOLEANS[value] = str.__new__(cls, value)
+        return instance
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the boolean; the value was validated by '__new__'."""
+
 
 class identifier(RegexConstrainedString):
     """
-    This type represents an 'integer' in a HOA file.
+    This type represents an 'identifier' in a HOA file.
 
-    It must match the following regex: "[a-zA-Z_][0-9a-zA-Z_-]*".
+    It must match the following regex: "[a-zA-Z_][0-9a-zA-Z_-]*",
+    except for the booleans "t" and "f".
     """
 
-    REGEX = re.compile("[a-zA-Z_][0-9a-zA-Z_-]*")
+    __slots__ = ()
+    REGEX = re.compile("(?![tf](?![0-9a-zA-Z_-]))[a-zA-Z_][0-9a-zA-Z_-]*")
 
 
 class alias(RegexConstrainedString):
@@ -68,6 +103,7 @@ class alias(RegexConstrainedString):
     It must match the following regex: "@[0-9a-zA-Z_-]+".
     """
 
+    __slots__ = ()
     REGEX = re.compile("@[0-9a-zA-Z_-]+")
 
 
@@ -78,9 +114,60 @@ class headername(RegexConstrainedString):
     It must match the following regex: "[a-zA-Z_][0-9a-zA-Z_-]*".
     """
 
+    __slots__ = ()
     REGEX = re.compile("[a-zA-Z_][0-9a-zA-Z_-]*")
 
 
+def _alternation(*types: Type[RegexConstrainedString]) -> Pattern:
+    """
+    Compile the alternation of the regexes of some token types.
+
+    Each alternative is a group named after its type, so that
+    a single match tells which type the token belongs to.
+
+    :param types: the token types, from the stricter to the looser.
+    :return: the compiled alternation.
+    """
+    return re.compile("|".join(f"(?P<{t.__name__}>{t.REGEX.pattern})" for t in types))
+
+
+_parse_boolean = {"t": True, "f": False}.__getitem__
+
+# The token classes are checked with the str methods, which scan the token
+# in C. 'isascii' rules out the non-ASCII digits and letters they accept.
+
+
+def _is_boolean(s: str) -> bool:
+    """Check that a string is a 'boolean' token, i.e. it matches [tf]."""
+    return s == "t" or s == "f"
+
+
+def _is_integer(s: str) -> bool:
+    """Check that a string is an 'integer' token, i.e. it matches 0|[1-9][0-9]*."""
+    return s.isascii() and s.isdigit() and (s[0] != "0" or s == "0")
+
+
+def _is_identifier(s: str) -> bool:
+    """Check that a string is an 'identifier' token, which cannot be a boolean."""
+    # '-' may occur anywhere but at the start; apart from it,
+    # ASCII Python identifiers match [a-zA-Z_][0-9a-zA-Z_]*.
+    return (
+        s.isascii()
+        and s[:1] != "-"
+        and s.replace("-", "_").isidentifier()
+        and not _is_boolean(s)
+    )
+
+
+# token classifiers with their parsers. The token classes are disjoint,
+# except for 'string', which is the fallback.
+_CLASSIFIERS: Tuple[Tuple[Callable[[str], bool], Callable[[str], Any]], ...] = (
+    (_is_boolean, _parse_boolean),
+    (_is_integer, int),
+    (_is_identifier, identifier),
+)
+
+
 class hoa_header_value(RegexConstrainedString):
     """
     This type represents a headername value in a HOA file.
@@ -88,9 +175,9 @@ class hoa_header_value(RegexConstrainedString):
     It must match (BOOLEAN|INT|STRING|IDENTIFIER)
     """
 
-    REGEX = re.compile(
-        f"({boolean.REGEX.pattern}|{integer.REGEX.pattern}|{string.REGEX.pattern}|{identifier.REGEX.pattern})"
-    )
+    __slots__ = ()
+    # from the stricter to the looser
+    REGEX = _alternation(boolean, integer, identifier, string)
 
     @staticmethod
     def to_header_value(value: "hoa_header_value") -> "HEADER_VALUES":
@@ -100,19 +187,34 @@ class hoa_header_value(RegexConstrainedString):
         :param s: the HOA header value string.
         :return: the header value.
         """
-        # from the stricter to the looser
         s = str(value)
-        if re.match(boolean.REGEX, s):
-            return bool(s)
-        if re.match(integer.REGEX, s):
-            return int(s)
-        if re.match(identifier.REGEX, s):
-            return identifier(s)
-        if re.match(string.REGEX, s):
-            return string(s)
-        raise ValueError(f"Cannot parse headername value {s}")
+        for is_token, parse in _CLASSIFIERS:
+            if is_token(s):
+                return parse(s)
+        # the 'string' regex matches any value as a prefix.
+        return string(s)
 
     @staticmethod
+    def classify_many(values: Iterable["hoa_header_value"]) -> List["HEADER_VALUES"]:
+        """
+        Convert a batch of HOA header value strings to Python objects.
+
+        This is equivalent to mapping 'to_header_value' over the values,
+        except that the values already converted, e.g. by the parser's
+        token callbacks, are kept as they are.
+
+        :param values: the HOA header value strings.
+        :return: the header values.
+        """
+        to_header_value = hoa_header_value.to_header_value
+        # integers include bools.
+        return [
+            value if isinstance(value, int) else to_header_value(value)
+            for value in values
+        ]
+
+    @staticmethod
+    @lru_cache(maxsize=4096, typed=True)
     def to_hoa_header_value(v: "HEADER_VALUES") -> "hoa_header_value":
         """
         Convert a header value to its HOA header value string.
@@ -120,10 +222,12 @@ class hoa_header_value(RegexConstrainedString):
         :param v: the header value.
         :return: the HOA header value string.
         """
-        if isinstance(v, bool):
-            return hoa_header_value("t" if v else "f")
+        if type(v) is bool:
+            return _TF_HEADER_VALUES[v]
         if isinstance(v, int):
             return hoa_header_value(str(v))
+        if not isinstance(v, str):
+            raise ValueError(f"Cannot convert value {v}: not a string.")
         try:
             return hoa_header_value(v)
         except Exception as e:
@@ -137,7 +241,12 @@ class proposition(RegexConstrainedString):
     It must match (BOOLEAN|INT|ANAME)
     """
 
-    REGEX = re.compile(f"({boolean.REGEX}|{integer.REGEX}|{alias.REGEX})")
+    __slots__ = ()
+    REGEX = _alternation(boolean, integer, alias)
+
+
+# the types of the converted acceptance parameters.
+_PARAMETER_TYPES = frozenset({bool, int, identifier})
 
 
 class acceptance_parameter(RegexConstrainedString):
@@ -147,29 +256,32 @@ class acceptance_parameter(RegexConstrainedString):
     It must match (IDENTIFIER | INT)
     """
 
-    REGEX = re.compile(
-        f"({boolean.REGEX.pattern}|{identifier.REGEX.pattern}|{integer.REGEX.pattern})"
-    )
+    __slots__ = ()
+    # from the stricter to the looser
+    REGEX = _alternation(boolean, integer, identifier)
 
     @staticmethod
     def to_parameter_value(value: "hoa_header_value") -> "ACCEPTANCE_PARAMETER":
         """
         Convert a HOA acceptance parameter string to a Python object.
 
+        Values that are already converted, e.g. by the parser's
+        token callbacks, are returned as they are.
+
         :param s: the HOA acceptance parameter string.
         :return: the parameter value.
         """
-        # from the stricter to the looser
+        if type(value) in _PARAMETER_TYPES:
+            # the type is one of those of 'ACCEPTANCE_PARAMETER'.
+            return cast("ACCEPTANCE_PARAMETER", value)
         s = str(value)
-        if re.match(boolean.REGEX, s):
-            return bool(s)
-        if re.match(integer.REGEX, s):
-            return int(s)
-        if re.match(identifier.REGEX, s):
-            return identifier(s)
+        for is_token, parse in _CLASSIFIERS:
+            if is_token(s):
+                return parse(s)
         raise ValueError(f"Cannot parse headername value {s}")
 
     @staticmethod
+    @lru_cache(maxsize=4096, typed=True)
     def to_acceptance_parameter(v: "ACCEPTANCE_PARAMETER") -> "acceptance_parameter":
         """
         Convert an acceptance parameter to its HOA header value string.
@@ -177,15 +289,21 @@ class acceptance_parameter(RegexConstrainedString):
         :param v: the header value.
         :return: the HOA header value string.
         """
-        if isinstance(v, bool):
-            return acceptance_parameter("t" if v else "f")
+        if type(v) is bool:
+            return _TF_ACCEPTANCE_PARAMETERS[v]
         if isinstance(v, int):
             return acceptance_parameter(str(v))
+        if not isinstance(v, str):
+            raise ValueError(f"Cannot convert value {v}: not a string.")
         try:
             return acceptance_parameter(v)
         except Exception as e:
             raise ValueError(f"Cannot convert value {v}: {str(e)}")
 
 
+# the HOA strings of False and True, indexed by the boolean.
+_TF_HEADER_VALUES = (hoa_header_value("f"), hoa_header_value("t"))
+_TF_ACCEPTANCE_PARAMETERS = (acceptance_parameter("f"), acceptance_parameter("t"))
+
 HEADER_VALUES = Union[bool, int, string, identifier]
 ACCEPTANCE_PARAMETER = Union[bool, int, identifier]
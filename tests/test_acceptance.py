@@ -16,9 +16,30 @@
 #
 
 """This module contains the test for the 'hoa.ast.acceptance' module."""
+import pickle  # nosec
 
-from hoa.ast.acceptance import Acceptance, accepting_sets, Fin, Inf, NotFin, NotInf
-from hoa.ast.boolean_expression import PositiveAnd, PositiveOr
+from hoa.ast.acceptance import (
+    _bin_popcount,
+    _popcount,
+    Acceptance,
+    AcceptanceAtom,
+    accepting_sets,
+    accepting_sets_mask,
+    AtomType,
+    Fin,
+    Inf,
+    nb_accepting_sets,
+    NotFin,
+    NotInf,
+)
+from hoa.ast.boolean_expression import (
+    FALSE,
+    FalseFormula,
+    PositiveAnd,
+    PositiveOr,
+    TRUE,
+    TrueFormula,
+)
 
 
 def test_accepting_sets():
@@ -41,3 +62,83 @@ def test_acceptance():
     """Test Acceptance instantiation."""
     fin0 = Fin(0)
     Acceptance(fin0, name="fin 0")
+
+
+def test_absorbing_element():
+    """Test that the absorbing element absorbs the other operands."""
+    assert PositiveAnd(Fin(0), FALSE, Inf(1)) == FALSE
+    assert PositiveOr(Fin(0), TRUE, Inf(1)) == TRUE
+
+
+def test_no_operands():
+    """Test that an operation without operands is its identity element."""
+    assert PositiveAnd() is TRUE
+    assert PositiveOr() is FALSE
+    assert PositiveAnd(TRUE, TRUE) is TRUE
+
+
+def test_pickle():
+    """Test that slotted acceptance conditions can be pickled."""
+    condition = Fin(0) & ~Inf(1)
+    assert not hasattr(condition, "__dict__")
+    assert pickle.loads(pickle.dumps(condition)) == condition  # nosec
+
+
+def test_atoms_are_interned():
+    """Test that equal atoms and boolean constants are the same object."""
+    assert Fin(0) is Fin(0)
+    assert NotInf(1) is NotInf(1)
+    assert Fin(0) == Fin(0) and Fin(0) != Inf(0) and Fin(0) != NotFin(0)
+    assert pickle.loads(pickle.dumps(Inf(2))) == Inf(2)  # nosec
+    assert TrueFormula() is TRUE
+    assert FalseFormula() is FALSE
+    atom = AcceptanceAtom(1, 3, False)
+    assert atom is Inf(3)
+    assert atom.atom_type is AtomType.INFINITE
+
+
+def test_acceptance_accepting_sets():
+    """Test the accepting sets precomputed by Acceptance."""
+    acceptance = Acceptance(Fin(0) & Inf(1))
+    assert acceptance.accepting_sets == {0, 1}
+    assert acceptance.nb_accepting_sets == 2
+
+
+def test_accepting_sets_mask():
+    """Test the bitmask representation of the accepting sets."""
+    condition = Fin(0) | (Inf(3) & ~Fin(0))
+    assert accepting_sets_mask(condition) == 0b1001
+    assert accepting_sets(condition) == {0, 3}
+    assert Acceptance(condition).accepting_sets_mask == 0b1001
+
+
+def test_nb_accepting_sets_of_leaves():
+    """Test the number of accepting sets of atoms and constants."""
+    assert accepting_sets_mask(NotInf(4)) == 0b10000
+    assert nb_accepting_sets(NotInf(4)) == 1
+    assert nb_accepting_sets(TRUE) == nb_accepting_sets(FALSE) == 0
+
+
+def test_accepting_sets_are_memoized():
+    """Test that the accepting sets are computed once per formula, and survive pickling."""
+    condition = Fin(0) & (Inf(1) | Fin(3))
+    first = accepting_sets(condition)
+    assert first == frozenset({0, 1, 3})
+    assert accepting_sets(condition) is first
+    unpickled = pickle.loads(pickle.dumps(condition))  # nosec
+    assert accepting_sets(unpickled) == first
+    assert accepting_sets(Fin(2)) == frozenset({2})
+
+
+def test_sparse_accepting_sets():
+    """Test the accepting sets and their number when the indices are sparse."""
+    condition = Fin(0) | Inf(70)
+    assert accepting_sets(condition) == frozenset({0, 70})
+    assert _popcount(accepting_sets_mask(condition)) == 2
+    assert _bin_popcount(accepting_sets_mask(condition)) == 2
+
+
+def test_no_accepting_sets_are_shared():
+    """Test that the empty sets of accepting sets are the same object."""
+    assert accepting_sets(TRUE) is accepting_sets(FALSE)
+    assert accepting_sets(TRUE) == frozenset()
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+# This file is part of hoa-utils.
+#
+# hoa-utils is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# hoa-utils is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with hoa-utils.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Tests for the hoa.core module."""
+import pickle  # nosec
+
+import pytest
+
+from hoa.ast.acceptance import Acceptance, Inf
+from hoa.ast.label import LabelAtom
+from hoa.core import Edge, HOABody, HOAHeader, State
+from hoa.dumpers import dumps
+from hoa.parsers import HOAParser
+from hoa.types import headername, identifier
+from tests.conftest import HOA_FILES
+
+
+def test_hoa_body_arrays():
+    """Test the structure-of-arrays representation of the HOA body."""
+    body = HOABody(
+        (State(0), State(1)),
+        (
+            [Edge([1], label=LabelAtom(0)), Edge([0, 1], acc_sig=frozenset({0}))],
+            [],
+        ),
+    )
+    arrays = body.to_arrays()
+    assert arrays.states == body.states
+    assert list(arrays.edge_ptr) == [0, 2, 2]
+    assert arrays.nb_edges == 2
+    assert list(arrays.successors(0)) == [1]
+    assert list(arrays.successors(1)) == [0, 1]
+    assert arrays.labels == (LabelAtom(0), None)
+    assert arrays.acc_sigs == (None, frozenset({0}))
+    assert [arrays.edge(j) for j in range(arrays.nb_edges)] == list(body.edges[0])
+
+
+def test_hoa_has_no_instance_dict():
+    """Test that the HOA data structures are slotted, and can still be pickled."""
+    hoa_obj = HOAParser()(HOA_FILES[0].read_text())
+    for obj in (hoa_obj, hoa_obj.header, hoa_obj.body, hoa_obj.header.acceptance):
+        assert not hasattr(obj, "__dict__")
+    assert pickle.loads(pickle.dumps(hoa_obj)) == hoa_obj  # nosec
+
+
+def test_hoa_body_accepting_sets_mask():
+    """Test the accepting sets used by the states and edges of a HOA body."""
+    signature = frozenset({0})
+    body = HOABody(
+        (State(0, acc_sig=frozenset({2})), State(1)),
+        (
+            [Edge([1], acc_sig=signature), Edge([0], acc_sig=signature)],
+            [Edge([0]), Edge([1], acc_sig={4})],
+        ),
+    )
+    assert body.accepting_sets_mask == 0b10101
+    assert HOABody((State(0),), ([],)).accepting_sets_mask == 0
+
+
+def test_header_dump_is_cached():
+    """Test that the HOA representation of a header is computed once, and not pickled."""
+    header = HOAParser()(HOA_FILES[0].read_text()).header
+    assert dumps(header) is dumps(header)
+    unpickled = pickle.loads(pickle.dumps(header))  # nosec
+    assert unpickled._memo is None
+    assert dumps(unpickled) == dumps(header)
+
+
+def test_header_is_frozen():
+    """Test that the sequences and mappings given to a header are frozen."""
+    properties = [identifier("trans-labels")]
+    headernames = {headername("foo"): [1]}
+    header = HOAHeader(
+        identifier("v1"),
+        Acceptance(Inf(0)),
+        start_states={frozenset({0})},
+        properties=properties,
+        headernames=headernames,
+    )
+    dump = dumps(header)
+    properties.append(identifier("state-acc"))
+    headernames[headername("bar")] = [2]
+    assert dumps(header) == dump
+    assert header.properties == (identifier("trans-labels"),)
+    assert isinstance(header.start_states, frozenset)
+    with pytest.raises(TypeError):
+        header.headernames[headername("bar")] = (2,)  # type: ignore
+    unpickled = pickle.loads(pickle.dumps(header))  # nosec
+    assert unpickled == header and dumps(unpickled) == dump
+
+
+def test_edge_state_conj_is_a_tuple():
+    """Test that the target states of an edge are frozen, so that edges are hashable."""
+    edge = Edge([0, 2], acc_sig=frozenset({1}))
+    assert edge.state_conj == (0, 2)
+    assert edge == Edge((0, 2), acc_sig=frozenset({1}))
+    assert len({edge, Edge((0, 2), acc_sig=frozenset({1}))}) == 1
+    assert dumps(edge) == "0&2 {1}"
+    assert dumps(Edge([1], acc_sig={0, 3})) == "1 {0 3}"
+
+
+def test_hoa_body_index2edges():
+    """Test the mapping from state indices to their outgoing edges."""
+    edges = [Edge([1])]
+    body = HOABody((State(1, name="s"), State(0)), (edges, []))
+    assert body.index2edges == {1: tuple(edges), 0: ()}
+    assert body.index2edges[1] is body.state2edges[State(1, name="s")]
+
+
+def test_hoa_body_mappings_are_cached_and_read_only():
+    """Test that the mappings of a HOA body are cached, and cannot be modified."""
+    edges = [Edge([0])]
+    body = HOABody((State(0),), (edges,))
+    assert body.state2edges is body.state2edges
+    assert body.index2edges is body.index2edges
+    edges.append(Edge([1]))
+    assert body.index2edges[0] == (Edge([0]),)
+    with pytest.raises(TypeError):
+        body.index2edges[1] = ()  # type: ignore
+
+
+def test_hoa_body_propositions():
+    """Test the propositions of the labels of a HOA body, which are cached."""
+    body = HOABody(
+        (State(0, label=LabelAtom(3)), State(1)),
+        ([Edge([1], label=LabelAtom(0) & ~LabelAtom(1))], [Edge([0])]),
+    )
+    assert body.propositions == {0, 1, 3}
+    assert body.propositions is body.propositions
+    assert HOABody((State(0),), ([],)).propositions == frozenset()
+
+
+def test_hoa_body_from_mapping():
+    """Test that a HOA body can still be built from a mapping from states to edges."""
+    state2edges = {State(0): [Edge([1])], State(1): []}
+    body = HOABody(state2edges)
+    assert body == HOABody((State(0), State(1)), ([Edge([1])], []))
+    assert body == HOABody.from_state2edges(state2edges)
+    with pytest.raises(TypeError):
+        HOABody((State(0),))
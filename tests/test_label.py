@@ -17,8 +17,22 @@
 
 """This module contains the test for the 'hoa.ast.label' module."""
 
-from hoa.ast.boolean_expression import And, Not, Or
-from hoa.ast.label import LabelAlias, LabelAtom, propositions
+import pickle  # nosec
+
+from hoa.ast.boolean_expression import (
+    And,
+    NODE_ALIAS,
+    NODE_ATOM,
+    NODE_BINARY_OP,
+    NODE_CONSTANT,
+    NODE_UNARY_OP,
+    NodeKinds,
+    Not,
+    Or,
+    post_order,
+    TRUE,
+)
+from hoa.ast.label import LabelAlias, LabelAtom, propositions, propositions_mask
 from hoa.types import alias
 
 
@@ -38,3 +52,98 @@ def test_propositions():
     assert isinstance(not_, Not)
 
     assert propositions(not_) == {0, 1, 2}
+
+
+def test_label_atoms_are_interned():
+    """Test that equal label atoms are the same object, and deduplicated."""
+    assert LabelAtom(0) is LabelAtom(proposition=0)
+    assert And(LabelAtom(0), LabelAtom(1), LabelAtom(0)).operands == (
+        LabelAtom(0),
+        LabelAtom(1),
+    )
+
+
+def test_label_atoms_store_plain_ints():
+    """Test that label atoms store their proposition as a plain int."""
+    atom = LabelAtom(True)
+    assert atom is LabelAtom(1)
+    assert type(atom.proposition) is int
+
+
+def test_node_kinds():
+    """Test that the kinds of the nodes are found, also for types not registered."""
+    node_kinds = NodeKinds({LabelAtom: NODE_ATOM, LabelAlias: NODE_ALIAS})
+    expression = And(LabelAtom(0), Not(LabelAtom(1)))
+    assert node_kinds[type(expression)] == NODE_BINARY_OP
+    assert node_kinds[type(expression.operands[1])] == NODE_UNARY_OP
+    assert node_kinds[LabelAtom] == NODE_ATOM
+    assert node_kinds[type(TRUE)] == NODE_CONSTANT
+    assert type(expression) in node_kinds
+
+
+def test_canonical_operations_with_few_operands():
+    """Test that canonical operations with fewer than two operands are simplified."""
+    assert And(_canonical=True) is TRUE
+    assert Or(LabelAtom(1), _canonical=True) is LabelAtom(1)
+    expression = And(LabelAtom(1), And(_canonical=True), _canonical=True)
+    assert str(expression) == "(& LabelAtom(proposition=1) (true))"
+
+
+def test_post_order():
+    """Test that the operations are visited after their operands."""
+    a, b, c = LabelAtom(0), LabelAtom(1), LabelAtom(2)
+    expression = And(a, Not(Or(b, c)))
+    assert list(post_order(expression)) == [
+        a,
+        b,
+        c,
+        Or(b, c),
+        Not(Or(b, c)),
+        expression,
+    ]
+
+
+def test_str_of_deep_expression():
+    """Test that the string of a deeply nested expression does not recurse."""
+    expression = LabelAtom(0)
+    for _ in range(5000):
+        expression = Not(expression)
+    assert str(expression) == "(! " * 5000 + "LabelAtom(proposition=0)" + ")" * 5000
+
+
+def test_hash_is_cached_and_not_pickled():
+    """Test that the hash of an operation is computed once, and recomputed after unpickling."""
+    expression = And(LabelAtom(0), Not(LabelAtom(1)))
+    assert hash(expression) == hash(And(LabelAtom(0), Not(LabelAtom(1))))
+    assert expression._hash == hash(expression)
+    unpickled = pickle.loads(pickle.dumps(expression))  # nosec
+    assert unpickled._hash is None
+    assert unpickled == expression and hash(unpickled) == hash(expression)
+
+
+def test_cached_data_is_not_pickled():
+    """Test that the cached string and memoized results of an operation are not pickled."""
+    expression = And(LabelAtom(0), Not(LabelAtom(1)))
+    expected_str = str(expression)
+    expected_propositions = propositions(expression)
+    assert expression._str is not None and expression._memo is not None
+    unpickled = pickle.loads(pickle.dumps(expression))  # nosec
+    assert unpickled._str is None and unpickled._memo is None
+    assert str(unpickled) == expected_str
+    assert propositions(unpickled) == expected_propositions
+
+
+def test_propositions_of_deep_expression():
+    """Test that the propositions of a deeply nested expression are collected without recursion."""
+    expression = LabelAtom(0)
+    for i in range(1, 5000):
+        expression = Not(And(expression, LabelAtom(i % 7)))
+    assert propositions(expression) == frozenset(range(7))
+
+
+def test_propositions_mask():
+    """Test the bitmask representation of the propositions."""
+    expression = LabelAtom(2) | LabelAlias(alias("@a"), LabelAtom(0) & LabelAtom(5))
+    assert propositions_mask(expression) == 0b100101
+    assert propositions(expression) == {0, 2, 5}
+    assert propositions_mask(LabelAtom(70)) == 1 << 70
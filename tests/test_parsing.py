@@ -22,13 +22,13 @@ from pathlib import Path
 
 import pytest
 
-from hoa.ast.acceptance import Fin, Inf, nb_accepting_sets
-from hoa.ast.boolean_expression import TRUE
+from hoa.ast.acceptance import Fin, Inf, nb_accepting_sets, NotFin, NotInf
+from hoa.ast.boolean_expression import FALSE, TRUE
 from hoa.ast.label import LabelAlias, LabelAtom
 from hoa.core import Acceptance, Edge, HOA, HOABody, HOAHeader, State
 from hoa.dumpers import dump
 from hoa.parsers import HOAParser
-from hoa.types import alias, identifier, string
+from hoa.types import alias, headername, identifier, string
 
 from .conftest import HOA_FILES, TEST_ROOT_DIR
 
@@ -48,6 +48,135 @@ def test_parsing_is_deterministic(filepath):
     assert hoa_obj_1 == hoa_obj_2
 
 
+def test_quotes_are_removed_once():
+    """Test that only the enclosing quotes of names are removed."""
+    hoa_obj = HOAParser()(
+        r"""HOA: v1
+name: "say \"hi\""
+Acceptance: 1 Inf(0)
+--BODY--
+State: 0 "\"quoted\""
+--END--"""
+    )
+    assert hoa_obj.header.name == r"say \"hi\""
+    assert hoa_obj.body.states[0].name == r"\"quoted\""
+
+
+def test_negated_acceptance_atoms():
+    """Test the parsing of negated acceptance atoms."""
+    hoa_obj = HOAParser()(
+        """HOA: v1
+Acceptance: 2 Fin(!0) & Inf(!1)
+--BODY--
+--END--"""
+    )
+    assert hoa_obj.header.acceptance.condition == NotFin(0) & NotInf(1)
+
+
+def test_acceptance_without_sets():
+    """Test the parsing of acceptance conditions without accepting sets."""
+    for condition, expected in (("t", TRUE), ("f", FALSE)):
+        hoa_obj = HOAParser()(
+            f"""HOA: v1
+Acceptance: 0 {condition}
+--BODY--
+--END--"""
+        )
+        assert hoa_obj.header.acceptance.condition == expected
+        assert hoa_obj.header.acceptance.nb_accepting_sets == 0
+
+
+def test_equal_labels_are_shared():
+    """Test that equal label expressions of an automaton are the same object."""
+    hoa_obj = HOAParser()(
+        """HOA: v1
+AP: 2 "a" "b"
+Acceptance: 0 t
+--BODY--
+State: 0
+[0 & !1] 0
+[!1 | 0 & !1] 0
+--END--"""
+    )
+    first, second = (edge.label for edge in hoa_obj.body.edges[0])
+    assert second.operands[1] is first
+    assert first.operands[1] is second.operands[0]
+
+
+def test_equal_acceptance_signatures_are_shared():
+    """Test that equal acceptance signatures of an automaton are the same object."""
+    hoa_obj = HOAParser()(
+        """HOA: v1
+Acceptance: 2 Inf(0) & Inf(1)
+--BODY--
+State: 0 {0 1}
+0 {1 0}
+0 {0 1}
+--END--"""
+    )
+    state_acc_sig = hoa_obj.body.states[0].acc_sig
+    assert state_acc_sig == {0, 1}
+    assert all(edge.acc_sig is state_acc_sig for edge in hoa_obj.body.edges[0])
+
+
+def test_state_acceptance_signature():
+    """Test that all the acceptance sets of a state are parsed."""
+    hoa_obj = HOAParser()(
+        """HOA: v1
+Acceptance: 2 Inf(0) & Inf(1)
+--BODY--
+State: 0 {0 1}
+--END--"""
+    )
+    assert hoa_obj.body.states[0].acc_sig == frozenset({0, 1})
+
+
+def test_custom_headers():
+    """Test the parsing of custom header items."""
+    hoa_obj = HOAParser()(
+        """HOA: v1
+Acceptance: 1 Inf(0)
+foo: "x y" 1 t abc
+--BODY--
+--END--"""
+    )
+    assert hoa_obj.header.headernames == {
+        identifier("foo"): (string('"x y"'), 1, True, identifier("abc"))
+    }
+
+
+def test_boolean_custom_header_names():
+    """Test that 't' and 'f' can be the names of custom header items."""
+    hoa_obj = HOAParser()(
+        """HOA: v1
+Acceptance: 1 Inf(0)
+t: 1
+f: x
+--BODY--
+--END--"""
+    )
+    assert hoa_obj.header.headernames == {
+        headername("t"): (1,),
+        headername("f"): (identifier("x"),),
+    }
+
+
+def test_operator_precedence():
+    """Test that '!' binds tighter than '&', which binds tighter than '|'."""
+    hoa_obj = HOAParser()(
+        """HOA: v1
+AP: 3 "a" "b" "c"
+Acceptance: 3 Fin(0) | Fin(1) & Inf(2)
+--BODY--
+State: 0
+[!0 & 1 | 2] 0
+--END--"""
+    )
+    assert hoa_obj.header.acceptance.condition == Fin(0) | (Fin(1) & Inf(2))
+    edge = hoa_obj.body.edges[0][0]
+    assert edge.label == (~LabelAtom(0) & LabelAtom(1)) | LabelAtom(2)
+
+
 class TestParsingAut1:
     """Test parsing for tests/examples/aut1."""
 
@@ -106,7 +235,10 @@ class TestParsingAut1:
             Edge([1], LabelAtom(1), {0}),
         ]
         state_edges_dict[State(1)] = [Edge([1], TRUE, {1})]
-        assert self.hoa_body.state2edges == state_edges_dict
+        # the edges are stored as tuples.
+        assert self.hoa_body.state2edges == {
+            state: tuple(edges) for state, edges in state_edges_dict.items()
+        }
 
 
 class TestParsingAut2:
@@ -174,7 +306,10 @@ class TestParsingAut2:
             Edge([2]),
         ]
 
-        assert self.hoa_body.state2edges == state_edges_dict
+        # the edges are stored as tuples.
+        assert self.hoa_body.state2edges == {
+            state: tuple(edges) for state, edges in state_edges_dict.items()
+        }
 
 
 class TestParsingAut3:
@@ -213,7 +348,7 @@ class TestParsingAut3:
             Edge([0], acc_sig=frozenset({1})),
             Edge([0], acc_sig=frozenset({0, 1})),
         ]
-        hoa_body = HOABody(state_edges_dict)
+        hoa_body = HOABody.from_state2edges(state_edges_dict)
         assert self.hoa_body == hoa_body
 
 
@@ -267,7 +402,7 @@ class TestParsingAut3_2:
                 acc_sig={0, 1},
             ),
         ]
-        hoa_body = HOABody(state_edges_dict)
+        hoa_body = HOABody.from_state2edges(state_edges_dict)
         assert self.hoa_body == hoa_body
 
 
@@ -306,7 +441,6 @@ class TestParsingAut4:
     def test_hoa_body(self):
         """Test that the HOA body is correct."""
         state_edges_dict = OrderedDict({})
-        hoa_body = HOABody(state_edges_dict)
         state_edges_dict[State(0)] = [
             Edge(
                 [0],
@@ -328,6 +462,7 @@ class TestParsingAut4:
                 acc_sig={0, 1},
             ),
         ]
+        hoa_body = HOABody.from_state2edges(state_edges_dict)
         assert self.hoa_body == hoa_body
 
 
@@ -367,7 +502,7 @@ class TestParsingAut5:
             Edge([0]),
             Edge([1]),
         ]
-        hoa_body = HOABody(state_edges_dict)
+        hoa_body = HOABody.from_state2edges(state_edges_dict)
         assert self.hoa_body == hoa_body
 
 
@@ -411,7 +546,7 @@ class TestParsingAut6:
             Edge([1], label=LabelAtom(0)),
             Edge([2], label=~LabelAtom(0)),
         ]
-        hoa_body = HOABody(state_edges_dict)
+        hoa_body = HOABody.from_state2edges(state_edges_dict)
 
         hoa_obj = HOA(hoa_header, hoa_body)
         assert self.hoa_obj == hoa_obj
@@ -472,7 +607,7 @@ class TestParsingAut7:
                 label=~(LabelAtom(0)) & ~LabelAtom(1),
             ),
         ]
-        hoa_body = HOABody(state_edges_dict)
+        hoa_body = HOABody.from_state2edges(state_edges_dict)
 
         hoa_obj = HOA(hoa_header, hoa_body)
         assert self.hoa_obj == hoa_obj
@@ -540,7 +675,7 @@ class TestParsingAut8:
                 acc_sig=frozenset({0}),
             ),
         ]
-        hoa_body = HOABody(state_edges_dict)
+        hoa_body = HOABody.from_state2edges(state_edges_dict)
 
         hoa_obj = HOA(hoa_header, hoa_body)
         assert self.hoa_obj == hoa_obj
@@ -580,7 +715,7 @@ class TestParsingAut11:
             Edge([2, 3], label=LabelAtom(1))
         ]
         state_edges_dict[State(3, name=string("c"))] = [Edge([1], label=LabelAtom(2))]
-        hoa_body = HOABody(state_edges_dict)
+        hoa_body = HOABody.from_state2edges(state_edges_dict)
 
         hoa_obj = HOA(hoa_header, hoa_body)
         assert self.hoa_obj == hoa_obj
@@ -16,9 +16,16 @@
 #
 
 """Test the printer module."""
+from io import StringIO
+
 from hoa.ast.acceptance import Fin, NotInf
 from hoa.ast.label import LabelAlias, LabelAtom
-from hoa.printers import acceptance_condition_to_string, label_expression_to_string
+from hoa.printers import (
+    _acceptance_subformula_to_string,
+    _emit_operation,
+    acceptance_condition_to_string,
+    label_expression_to_string,
+)
 from hoa.types import alias
 
 
@@ -47,3 +54,29 @@ def test_printer_label():
     expected = "(!(2 | @d))"
     actual = label_expression_to_string(not_)
     assert actual == expected
+
+
+def test_printer_deep_label():
+    """Test that printing deeply nested label expressions does not recurse."""
+    f = LabelAtom(0)
+    for _ in range(5000):
+        f = ~f
+    expected = "(!" * 5000 + "0" + ")" * 5000
+    assert label_expression_to_string(f) == expected
+
+
+def test_printer_to_file():
+    """Test that writing an operation to a file gives the same string."""
+    condition = Fin(0) | (Fin(1) & ~NotInf(2))
+    fp = StringIO()
+    _emit_operation(condition, _acceptance_subformula_to_string, fp.write)
+    assert fp.getvalue() == acceptance_condition_to_string(condition)
+
+
+def test_printer_is_memoized():
+    """Test that the string of an operation is computed once."""
+    label = LabelAtom(0) & ~LabelAtom(1)
+    assert label_expression_to_string(label) is label_expression_to_string(label)
+    condition = Fin(0) | Fin(1)
+    first = acceptance_condition_to_string(condition)
+    assert acceptance_condition_to_string(condition) is first
@@ -20,26 +20,28 @@ import shutil
 import tempfile
 from io import StringIO
 from pathlib import Path
-from unittest import mock
-from unittest.mock import MagicMock
 
 import pytest
-from click.testing import CliRunner
 
-from hoa.dumpers import dump
-from hoa.tools.pyhoafparser import main
+from hoa.dumpers import dump, dumps, iter_dump
+from hoa.parsers import HOAParser
+from hoa.tools.pyhoafparser import _store_cached, main
 from tests.conftest import HOA_FILES
 from tests.test_utils import cd
 
 
-@mock.patch("hoa.dumpers.dumps", return_value="example")
-def test_dump(*_mocks):
-    """Test the dump method."""
-    hoa_object = MagicMock()
+@pytest.mark.parametrize(
+    "filepath",
+    HOA_FILES,
+)
+def test_dump(filepath):
+    """Test that the dump method writes the same output as dumps."""
+    hoa_object = HOAParser()(Path(filepath).read_text())
     fp = StringIO()
     dump(hoa_object, fp)
     fp.seek(0)
-    assert fp.read() == "example"
+    assert fp.read() == dumps(hoa_object)
+    assert "".join(iter_dump(hoa_object)) == dumps(hoa_object)
 
 
 def test_which_pyhoafparser():
@@ -51,11 +53,11 @@ def test_which_pyhoafparser():
     "filepath",
     HOA_FILES,
 )
-def test_pyhoafparser_positive(filepath):
+def test_pyhoafparser_positive(filepath, capsys):
     """Test pyhoafparser, positive case."""
-    runner = CliRunner()
-    result = runner.invoke(main, [str(filepath.absolute())])
-    assert result.exit_code == 0, result.exc_info
+    main([str(filepath.absolute())])
+    expected = dumps(HOAParser()(filepath.read_text()))
+    assert capsys.readouterr().out == expected + "\n"
 
 
 @pytest.mark.parametrize(
@@ -64,12 +66,55 @@ def test_pyhoafparser_positive(filepath):
 )
 def test_pyhoafparser_positive_with_file(filepath):
     """Test pyhoafparser, positive case, with output file."""
-    runner = CliRunner()
     with tempfile.TemporaryDirectory() as temp_dir:
         output_file = "output"
         with cd(temp_dir):
-            result = runner.invoke(
-                main, [str(filepath.absolute()), "--output", output_file]
-            )
-        assert result.exit_code == 0, result.exc_info
+            main([str(filepath.absolute()), "--output", output_file])
         assert Path(temp_dir, output_file).exists()
+
+
+def test_pyhoafparser_missing_file(capsys):
+    """Test pyhoafparser exits with a usage error when the input file is missing."""
+    with pytest.raises(SystemExit) as exc_info:
+        main(["missing.hoa"])
+    assert exc_info.value.code == 2
+    assert "does not exist" in capsys.readouterr().err
+
+
+def test_pyhoafparser_with_cache(capsys, monkeypatch):
+    """Test that pyhoafparser gives the same output when the automaton is cached."""
+    filepath = str(HOA_FILES[0].absolute())
+    with tempfile.TemporaryDirectory() as cache_dir:
+        main([filepath, "--cache-dir", cache_dir])
+        output_1 = capsys.readouterr().out
+        assert len(list(Path(cache_dir).glob("*.pkl"))) == 1
+
+        def fail(*_args):
+            raise AssertionError("the automaton should be loaded from the cache.")
+
+        # the second run is a cache hit, hence it does not parse the file.
+        monkeypatch.setattr(HOAParser, "__call__", fail)
+        main([filepath, "--cache-dir", cache_dir])
+        output_2 = capsys.readouterr().out
+        assert output_1 == output_2
+
+
+def test_pyhoafparser_with_unwritable_cache(capsys):
+    """Test that pyhoafparser still works when the cache cannot be written."""
+    filepath = str(HOA_FILES[0].absolute())
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # a regular file cannot be the cache directory.
+        cache_dir = Path(temp_dir) / "cache"
+        cache_dir.touch()
+        main([filepath, "--cache-dir", str(cache_dir)])
+        assert (
+            capsys.readouterr().out
+            == dumps(HOAParser()(Path(filepath).read_text())) + "\n"
+        )
+
+
+def test_failed_cache_write_leaves_no_file():
+    """Test that a failed write to the cache leaves no temporary file behind."""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        _store_cached(Path(cache_dir), "key", lambda: None)  # type: ignore
+        assert list(Path(cache_dir).iterdir()) == []
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+# This file is part of hoa-utils.
+#
+# hoa-utils is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# hoa-utils is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with hoa-utils.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Tests for the hoa.types module."""
+import pytest
+
+from hoa.types import (
+    _is_boolean,
+    _is_identifier,
+    _is_integer,
+    acceptance_parameter,
+    boolean,
+    hoa_header_value,
+    identifier,
+    integer,
+    string,
+)
+
+
+def test_same_type_value_is_returned_as_is():
+    """Test that wrapping a value of the same type returns the value itself."""
+    value = identifier("a")
+    assert identifier(value) is value
+
+
+def test_invalid_value_raises_error():
+    """Test that a value not matching the regex is rejected."""
+    with pytest.raises(ValueError):
+        integer("a")
+    with pytest.raises(ValueError):
+        identifier(integer("0"))
+
+
+def test_to_header_value():
+    """Test the coercion of header values, which must match a whole token."""
+    assert hoa_header_value.to_header_value("t") is True
+    assert hoa_header_value.to_header_value("f") is False
+    assert hoa_header_value.to_header_value("12") == 12
+    assert hoa_header_value.to_header_value("true") == identifier("true")
+    assert hoa_header_value.to_header_value('"a b"') == string('"a b"')
+    assert acceptance_parameter.to_parameter_value("f") is False
+    assert acceptance_parameter.to_parameter_value("0") == 0
+    with pytest.raises(ValueError):
+        acceptance_parameter.to_parameter_value("12ab")
+
+
+def test_to_hoa_header_value_distinguishes_bools_from_ints():
+    """Test that the cached conversions do not confuse True and 1."""
+    assert hoa_header_value.to_hoa_header_value(1) == "1"
+    assert hoa_header_value.to_hoa_header_value(True) == "t"
+    assert acceptance_parameter.to_acceptance_parameter(0) == "0"
+    assert acceptance_parameter.to_acceptance_parameter(False) == "f"
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "",
+        "t",
+        "f",
+        "0",
+        "01",
+        "10",
+        "²",
+        "a",
+        "_a-1",
+        "-a",
+        "1a",
+        "tt",
+        "a b",
+        "٣",
+        "é",
+        "a-é",
+    ],
+)
+def test_token_classifiers_agree_with_regexes(token):
+    """Test that the token classifiers accept the same tokens as the regexes."""
+    assert _is_boolean(token) == (boolean.REGEX.fullmatch(token) is not None)
+    assert _is_integer(token) == (integer.REGEX.fullmatch(token) is not None)
+    assert _is_identifier(token) == (identifier.REGEX.fullmatch(token) is not None)
+
+
+def test_booleans_are_not_identifiers():
+    """Test that 't' and 'f' are not valid identifiers."""
+    with pytest.raises(ValueError):
+        identifier("t")
+    assert identifier("tf") == "tf"
+    assert hoa_header_value.to_header_value("f") is False
+
+
+def test_classify_many():
+    """Test that classify_many agrees with to_header_value."""
+    values = ["t", "f", "0", "12", "abc", "a-b", "٣", '"x y"']
+    expected = [hoa_header_value.to_header_value(v) for v in values]
+    assert hoa_header_value.classify_many(values) == expected
+    assert hoa_header_value.classify_many([True, 3]) == [True, 3]
+
+
+def test_to_hoa_header_value_rejects_non_strings():
+    """Test that values which are neither booleans, integers nor strings are rejected."""
+    with pytest.raises(ValueError):
+        hoa_header_value.to_hoa_header_value(1.5)
+    with pytest.raises(ValueError):
+        acceptance_parameter.to_acceptance_parameter(None)
+
+
+def test_to_parameter_value():
+    """Test the conversion of acceptance parameters, also when already converted."""
+    assert acceptance_parameter.to_parameter_value("t") is True
+    assert acceptance_parameter.to_parameter_value("3") == 3
+    assert acceptance_parameter.to_parameter_value("min") == identifier("min")
+    value = identifier("even")
+    assert acceptance_parameter.to_parameter_value(value) is value
+    assert acceptance_parameter.to_parameter_value(2) == 2
+    with pytest.raises(ValueError):
+        acceptance_parameter.to_parameter_value('"a"')
+
+
+@pytest.mark.parametrize(
+    "value",
+    [string('"a"'), integer("1"), boolean("t"), identifier("a"), hoa_header_value("1")],
+)
+def test_tokens_have_no_instance_dict(value):
+    """Test that the token types do not allocate an instance dictionary."""
+    assert not hasattr(value, "__dict__")
+
+
+def test_boolean_instances_are_shared():
+    """Test that 'boolean' returns one instance per value, and validates the whole token."""
+    assert boolean("t") is boolean("t")
+    assert boolean("f") is boolean(boolean("f"))
+    assert boolean("t") != boolean("f")
+    with pytest.raises(ValueError):
+        boolean("tt")
+    with pytest.raises(ValueError):
+        boolean(True)